@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sense_emu import SenseHat
+from sense_emu import font
+
+DIR_PATH = os.path.dirname(os.path.abspath(__file__))
+IMAGE_PATH = os.path.join(DIR_PATH, 'pixil-frame-0.png')
+TEXT_ASSETS = os.path.join(DIR_PATH, 'sense_emu', 'sense_hat_text')
+
+# Seconds each benchmark is timed for, after one warm-up call, split into
+# rounds of which the fastest is reported
+MIN_TIME = 0.5
+ROUNDS = 5
+
+# A benchmark regresses when its ops/sec drops, or its allocations per call
+# grow, by more than this fraction of the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Importing sense_emu must stay cheap enough for short scripts like test.py,
+# and must not drag in the dependencies that are loaded lazily
+IMPORT_BUDGET_MS = 50
+LAZY_MODULES = ('pygame', 'PIL', 'numpy', 'asyncio')
+
+EVENT_FLOOD_SIZE = 1000
+
+# func is the call being measured. setup, if given, runs before every call
+# outside the timed region, for benchmarks that consume their input.
+class Benchmark:
+    def __init__(self, name, func, setup=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+    def time(self, min_time=MIN_TIME, rounds=ROUNDS):
+        if self.setup is not None:
+            self.setup()
+        self.func()
+
+        # Grow the batch until one round fills its share of min_time, then
+        # keep the best round so scheduler noise only ever slows a round down
+        calls = 1
+        elapsed = self._time_calls(calls)
+        while elapsed < min_time / rounds:
+            calls *= 2
+            elapsed = self._time_calls(calls)
+
+        best = elapsed
+        for _ in range(rounds - 1):
+            best = min(best, self._time_calls(calls))
+
+        return calls / best
+
+    def _time_calls(self, calls):
+        if self.setup is None:
+            start = time.perf_counter()
+            for _ in range(calls):
+                self.func()
+            return time.perf_counter() - start
+
+        elapsed = 0
+        for _ in range(calls):
+            self.setup()
+            start = time.perf_counter()
+            self.func()
+            elapsed += time.perf_counter() - start
+
+        return elapsed
+
+    # Peak bytes allocated by one call, measured with tracemalloc
+    def allocations(self):
+        if self.setup is not None:
+            self.setup()
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            self.func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return peak - before
+
+def build_benchmarks():
+    sense = SenseHat(backend='headless')
+    backend = sense.backend
+    frames = [[[i, 255 - i, i // 2]] * 64 for i in range(256)]
+    counter = iter(range(1 << 62))
+
+    def set_pixels():
+        sense.set_pixels(frames[next(counter) & 255])
+
+    def set_pixel():
+        i = next(counter)
+        sense.set_pixel(i & 7, (i >> 3) & 7, frames[i & 255][0])
+
+    palette = sense.register_palette('benchmark', {tuple(frame[0]) for frame in frames})
+    indexed_frames = [bytes((i + j) % len(palette) for j in range(64)) for i in range(256)]
+
+    def set_pixels_indexed():
+        sense.set_pixels_indexed(indexed_frames[next(counter) & 255], palette)
+
+    def clear():
+        sense.clear(frames[next(counter) & 255][0])
+
+    def rotation(angle):
+        return lambda: sense.set_rotation(angle)
+
+    def show_letter():
+        sense.show_letter(chr(ord('A') + next(counter) % 26))
+
+    def show_message():
+        sense.show_message('Hello World!', scroll_speed=0)
+
+    def render_message():
+        sense.clear_message_cache()
+        sense._render_message('Hello World!', [255, 255, 255], [0, 0, 0])
+
+    def load_text():
+        sense._load_text(f"{TEXT_ASSETS}.png", f"{TEXT_ASSETS}.txt")
+
+    def load_text_uncached():
+        font._atlases.clear()
+        load_text()
+
+    def load_text_compile():
+        font._atlases.clear()
+        atlas = font.atlas_path(f"{TEXT_ASSETS}.png")
+        if os.path.exists(atlas):
+            os.remove(atlas)
+        load_text()
+
+    def flood():
+        for i in range(EVENT_FLOOD_SIZE):
+            backend.push_event('up', 'pressed' if i % 2 == 0 else 'released')
+
+    benchmarks = [
+        Benchmark('set_pixels', set_pixels),
+        Benchmark('set_pixels_indexed', set_pixels_indexed),
+        Benchmark('set_pixels_indexed_same', lambda: sense.set_pixels_indexed(indexed_frames[0], palette)),
+        Benchmark('set_pixel', set_pixel),
+        Benchmark('clear', clear),
+    ]
+
+    benchmarks.extend(Benchmark(f"set_rotation_{angle}", rotation(angle)) for angle in (0, 90, 180, 270))
+
+    benchmarks.extend([
+        Benchmark('flip_h', sense.flip_h),
+        Benchmark('flip_v', sense.flip_v),
+        Benchmark('load_image', lambda: sense.load_image(IMAGE_PATH)),
+        Benchmark('load_image_uncached', lambda: sense.load_image(IMAGE_PATH), sense.clear_image_cache),
+        Benchmark('show_letter', show_letter),
+        Benchmark('show_message_cached', show_message),
+        Benchmark('render_message', render_message),
+        Benchmark('load_text', load_text),
+        Benchmark('load_text_disk_cache', load_text_uncached),
+        Benchmark('load_text_compile', load_text_compile),
+        Benchmark('get_events_flood', sense.stick.get_events, flood),
+    ])
+
+    return sense, benchmarks
+
+# Best of several fresh interpreters, so earlier runs cannot warm the caches.
+# Bytecode is cached in a scratch directory (and the first run discarded) so
+# compiling the sources is not counted.
+def measure_import(runs=5):
+    code = (
+        'import sys, time\n'
+        't = time.perf_counter()\n'
+        'import sense_emu\n'
+        'print(time.perf_counter() - t)\n'
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    best = None
+    loaded = ''
+
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPATH=DIR_PATH, PYTHONPYCACHEPREFIX=pycache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+        for i in range(runs + 1):
+            out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+            seconds, loaded = out.stdout.splitlines()
+
+            if i > 0:
+                seconds = float(seconds)
+                best = seconds if best is None else min(best, seconds)
+
+    return best, [m for m in loaded.split(',') if m]
+
+def run(names=None, min_time=MIN_TIME):
+    sense, benchmarks = build_benchmarks()
+    results = {}
+
+    for bench in benchmarks:
+        if names and bench.name not in names:
+            continue
+
+        results[bench.name] = {
+            'ops_per_sec': bench.time(min_time),
+            'alloc_bytes': bench.allocations(),
+        }
+
+    if not names or 'import' in names:
+        seconds, loaded = measure_import()
+        results['import'] = {
+            'ops_per_sec': 1 / seconds,
+            'alloc_bytes': 0,
+            'seconds': seconds,
+            'eager_modules': loaded,
+        }
+
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        if result['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: {result['ops_per_sec']:.0f} ops/s, baseline {base['ops_per_sec']:.0f} ops/s")
+
+        if result['alloc_bytes'] > base['alloc_bytes'] * (1 + threshold) + 64:
+            regressions.append(f"{name}: {result['alloc_bytes']} bytes/call, baseline {base['alloc_bytes']} bytes/call")
+
+    return regressions
+
+def check_import(results):
+    problems = []
+    result = results.get('import')
+
+    if result is None:
+        return problems
+
+    if result['seconds'] * 1000 > IMPORT_BUDGET_MS:
+        problems.append(f"import: {result['seconds'] * 1000:.1f} ms, budget {IMPORT_BUDGET_MS} ms")
+
+    if result['eager_modules']:
+        problems.append(f"import: loads {', '.join(result['eager_modules'])} eagerly")
+
+    return problems
+
+def print_results(results, baseline=None):
+    print(f"{'benchmark':<24}{'ops/sec':>14}{'bytes/call':>12}{'vs baseline':>14}")
+
+    for name, result in results.items():
+        change = ''
+        if baseline and name in baseline:
+            change = f"{result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:+.1%}"
+
+        print(f"{name:<24}{result['ops_per_sec']:>14,.0f}{result['alloc_bytes']:>12,}{change:>14}")
+
+    if 'import' in results:
+        print(f"import sense_emu: {results['import']['seconds'] * 1000:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sense_emu API hot paths headlessly.')
+    parser.add_argument('names', nargs='*', help='only run these benchmarks')
+    parser.add_argument('--save', metavar='PATH', help='store the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a stored baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed slowdown before flagging a regression')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help='seconds to time each benchmark for')
+    args = parser.parse_args()
+
+    results = run(args.names, args.min_time)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    problems = check_import(results)
+    if baseline is not None:
+        problems.extend(compare(results, baseline, args.threshold))
+
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
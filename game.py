@@ -136,8 +136,9 @@ class Game:
         self.playerPoints = 0
         self.pointLimit = pointLimit
 
-        self.board = []
+        self.board = bytearray(64)
         self.borderColor = borderColor
+        self.palette = sense.register_palette('game', [e, borderColor, r, b, m])
 
         self.hasFinished = False
        
@@ -148,27 +149,22 @@ class Game:
         self.updateScreen()
         while self.hasFinished == False:
             hasMoved = False
-            for event in sense.stick.get_events():
-                if event.action == 'pressed':
-                    if event.direction == 'up':
-                        self.player.move(Coordinates(0, -1))
-                        hasMoved = True
-                        break
-                    elif event.direction == 'left':
-                        self.player.move(Coordinates(-1, 0))
-                        hasMoved = True
-                        break
-                    elif event.direction == 'down':
-                        self.player.move(Coordinates(0, 1))
-                        hasMoved = True
-                        break
-                    elif event.direction == 'right':
-                        self.player.move(Coordinates(1, 0))
-                        hasMoved = True
-                        break
+            event = sense.stick.wait_for_event()
+            if event.action == 'pressed':
+                if event.direction == 'up':
+                    self.player.move(Coordinates(0, -1))
+                    hasMoved = True
+                elif event.direction == 'left':
+                    self.player.move(Coordinates(-1, 0))
+                    hasMoved = True
+                elif event.direction == 'down':
+                    self.player.move(Coordinates(0, 1))
+                    hasMoved = True
+                elif event.direction == 'right':
+                    self.player.move(Coordinates(1, 0))
+                    hasMoved = True
             
             if hasMoved == False:
-                time.sleep(0.05)
                 continue
 
             if self.player.hasCollided(self.enemyList):
@@ -213,14 +209,17 @@ class Game:
        # sense.show_message("Winner!", 0.075, text_colour = (255,100,0), back_colour= g)
 
     def resetBoard(self):
-        self.board = []
+        border = self.palette.index(self.borderColor)
+        empty = self.palette.index(e)
+
+        self.board = bytearray(64)
         for i in range(64):
             if i < 8 or i >= 56:
-                self.board.append(self.borderColor)
+                self.board[i] = border
             elif i % 8 == 0 or i % 8 == 7:
-                self.board.append(self.borderColor)
+                self.board[i] = border
             else:
-                self.board.append((0, 0, 0))
+                self.board[i] = empty
 
     def shouldAddEnemy(self):
         return (7 + (len(self.enemyList) * 7)) <= self.playerPoints
@@ -230,7 +229,7 @@ class Game:
 
     def placeEntity(self, entity):
         idx = entity.convertToUnaryCoords()
-        self.board[idx] = entity.color
+        self.board[idx] = self.palette.index(entity.color)
 
     def updateScreen(self):
         self.resetBoard()
@@ -241,6 +240,6 @@ class Game:
         for enemy in self.enemyList:
             self.placeEntity(enemy)
 
-        sense.set_pixels(self.board)
+        sense.set_pixels_indexed(self.board, self.palette)
 
 Game()
\ No newline at end of file
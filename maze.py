@@ -1,10 +1,12 @@
 from sense_emu import SenseHat
+from sense_emu.cache import LRUCache
 from collections import deque
-from itertools import cycle
-from time import sleep
+from itertools import cycle, permutations
 
 import random
 import math
+import mmap
+import tempfile
 
 sense = SenseHat()
 
@@ -43,37 +45,48 @@ class Coordinates:
 
 DIRECTIONS = [Coordinates(0, -1), Coordinates(0, 1), Coordinates(-1, 0), Coordinates(1, 0)]
 
-class Node(Coordinates):
-    def __init__(self, x, y):
-        super().__init__(x, y)
-        self.connections = []
-        self.visited = False
-        self.walls = [0, 0, 0, 0] # U, D, R, L
-
-    def addConnections(self, connectedNode):
-        self.connections.append(connectedNode)
-        self.addWall(connectedNode)
-    
-    def addWall(self, connectedNode):
-        for i in range(len(DIRECTIONS)):
-            if connectedNode.isEqual(self.addCoords(DIRECTIONS[i])) == True:
-                self.walls[i] = 1
-                return
+# Passage bits kept per cell, in the same order as DIRECTIONS
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
 
-    def isConnectedDirection(self, coords):
-        for i in range(len(self.connections)):
-            if self.connections[i].isEqual(coords):
-                return True
-        return False
+# Display characters for a cell and the walls right of and below it, indexed
+# by the cell's passage bits. A cell with no passages at all (only possible in
+# a 1x1 maze) stays solid.
+CELL_CHARS = bytes(ord('#') if i == 0 else ord(' ') for i in range(256))
+RIGHT_CHARS = bytes(ord(' ') if i & RIGHT else ord('#') for i in range(256))
+DOWN_CHARS = bytes(ord(' ') if i & DOWN else ord('#') for i in range(256))
 
-    def mark(self):
-        self.visited = True;
+# Display characters a path can't enter map to 1
+OPEN_CELLS = bytes(0 if i == ord(' ') else 1 for i in range(256))
 
-    def __str__(self):
-        return f"({self.x}, {self.y}, {len(self.connections)})"
+# The two display rows for a row of cells: the cells with the walls right of
+# them, then the walls below them. Whole rows are built at once, translating
+# the passage bits into characters and interleaving them by slice assignment,
+# so no cell is visited from Python.
+def drawRow(row):
+    size = len(row) * 2 + 1
 
-    def __repr__(self):
-        return f"({self.x}, {self.y}, {len(self.connections)}))"
+    cellLine = bytearray(b'#') * size
+    cellLine[1::2] = row.translate(CELL_CHARS)
+    cellLine[2::2] = row.translate(RIGHT_CHARS)
+
+    downLine = bytearray(b'#') * size
+    downLine[1::2] = row.translate(DOWN_CHARS)
+
+    return cellLine, downLine
+
+# Palette indices used by Game.render for each display character
+COLOUR_INDEX = bytes({ord(' '): 0, ord('S'): 2, ord('E'): 3}.get(i, 1) for i in range(256))
+PLAYER_INDEX = bytes([4])
+
+# Recently rendered 8x8 windows kept by Game.render
+WINDOW_CACHE_SIZE = 64
+
+# Marks cells as visited while the maze is generated
+VISITED = 16
+CLEAR_VISITED = bytes(i & ~VISITED for i in range(256))
 
 class Player(Coordinates):
     def __init__(self, start=Coordinates(1, 0)):
@@ -88,27 +101,23 @@ class Maze:
         self.height = h
         self.startCoords = start
 
-        # Contains all nodes
-        self.data = []
+        # One byte per cell, row by row, holding the UP/DOWN/LEFT/RIGHT bits
+        # of the passages leading out of it [Populated by DFS maze generation]
+        self.cells = bytearray(w * h)
 
-        # Maze with walls [Populated after DFS maze generation]
+        # Maze with walls [Populated by @self.draw()]
         self.mazeDisplay = []
 
         self.blankSpace = ' '
         self.wall = '#'
 
-        self.initializeNodes()
-        self.initMazeDisplay()
-
         self.createMaze()
     
     # START DEBUG PRINTS
     def display(self):
-        for i in range(len(self.data)):
-            for j in range(len(self.data[i])):
-                print(self.data[i][j].visited, end=' ')
-                print(len(self.data[i][j].connections), end=' ')
-            print(' ')
+        for i in range(self.height):
+            row = self.cells[i * self.width:(i + 1) * self.width]
+            print(' '.join(format(walls, 'x') for walls in row))
     
     def showMaze(self):
         print('#'*(len(self.mazeDisplay[0])+1))
@@ -118,172 +127,266 @@ class Maze:
             print(line)
     # END DEBUG PRINTS
 
-    # START INITIALIZE ARRAYS
-    def initializeNodes(self):
-        for i in range(self.height):
-            rowAra = []
-            for j in range(self.width):
-                rowAra.append(Node(j, i))
-            self.data.append(rowAra)
-
-    def initMazeDisplay(self):
-        self.mazeDisplay = [[ '#' for x in range(0,self.width*2)] for y in range(0,self.height*2)]
-    #END INITIALIZE ARRAYS
-
-    def getNode(self, coords):
-        return self.data[coords.y][coords.x]
-
-    def markNode(self, coords):
-        self.getNode(coords).mark()
-
-    # START Helper functions for @self.draw()
-    def clearWall(self, coords):
-        self.mazeDisplay[coords.y][coords.x] = self.blankSpace
+    def isConnected(self, coords, direction):
+        return self.cells[coords.y * self.width + coords.x] & direction != 0
 
-    def addWall(self, coords):
-        self.mazeDisplay[coords.y][coords.x] = '#'
-    
+    # START Helper functions for @self.findLongestPath()
     def setStart(self, coords):
         self.mazeDisplay[coords.y][coords.x] = 'S'
 
     def setEnd(self, coords):
         self.mazeDisplay[coords.y][coords.x] = 'E'
 
-    # END Helper functions for @self.draw()
+    # END Helper functions for @self.findLongestPath()
 
-    # Populates @self.mazeDisplay
+    # Populates @self.mazeDisplay, two display rows per row of cells
     def draw(self):
-        for i in range(len(self.data)):
-            for j in range(len(self.data[i])):
-                currentNode = self.getNode(Coordinates(j, i))
-                for k in range(len(DIRECTIONS)):
-                    tempPos = currentNode.addCoords(DIRECTIONS[k])
-                    if not tempPos.validCoords(self.width, self.height):
-                        continue
-                    if currentNode.isConnectedDirection(tempPos) == True:
-                        self.clearWall(currentNode.expandCoords().addCoords(DIRECTIONS[k]))
-                        self.clearWall(currentNode.expandCoords())
-                    else:
-                        self.addWall(currentNode.expandCoords().addCoords(DIRECTIONS[k]))
-
-        #ADD LEFT
-        for i in range(len(self.mazeDisplay)):
-            self.mazeDisplay[i].insert(0, '#')
-        
-        #ADD TOP BORDER
-        tAra = []
-        for i in range(len(self.mazeDisplay[0])):
-            tAra.append('#')
-
-        self.mazeDisplay.insert(0, tAra)
+        self.mazeDisplay = [[self.wall] * (self.width * 2 + 1)]
 
+        for i in range(self.height):
+            for line in drawRow(self.cells[i * self.width:(i + 1) * self.width]):
+                self.mazeDisplay.append(list(line.decode()))
+
+    # Depth first search with an explicit stack, over a copy of the grid padded
+    # with a border of visited cells so neighbours never need bounds checks.
+    # A cell counts as visited once any bit is set, so the start cell and the
+    # border carry an extra VISITED bit. Each step tries the directions in one
+    # of their 24 orders picked at random, like shuffling them; the picks are
+    # drawn up front since the walk takes exactly 2 * w * h - 1 steps.
+    def createMaze(self):
+        width = self.width + 2
+        cells = bytearray([VISITED]) * (width * (self.height + 2))
 
-    def checkForUnvisitedNeighbors(self, curNode):
+        for i in range(self.height):
+            start = (i + 1) * width + 1
+            cells[start:start + self.width] = bytes(self.width)
 
-        directions = DIRECTIONS.copy() #[Coordinates(1, 0), Coordinates(-1, 0), Coordinates(0, 1), Coordinates(0, -1)]
-        random.shuffle(directions)
-        validNeighbors = []
+        steps = [(-width, UP, DOWN), (width, DOWN, UP), (-1, LEFT, RIGHT), (1, RIGHT, LEFT)]
+        orders = iter(random.choices(list(permutations(steps)), k=2 * self.width * self.height))
 
-        for i in range(len(directions)):
-            tempCoords = curNode.addCoords(directions[i])
+        path = []
+        cur = (self.startCoords.y + 1) * width + self.startCoords.x + 1
+        cells[cur] = VISITED
 
-            if not tempCoords.validCoords(self.width, self.height):
+        while True:
+            for offset, bit, back in next(orders):
+                nextCell = cur + offset
+                if not cells[nextCell]:
+                    break
+            else:
+                if not path:
+                    break
+                cur = path.pop()
                 continue
 
-            if self.getNode(tempCoords).visited:
-                continue
+            cells[cur] |= bit
+            cells[nextCell] = back
+            path.append(cur)
+            cur = nextCell
 
-            validNeighbors.append(self.getNode(tempCoords))
+        for i in range(self.height):
+            start = (i + 1) * width + 1
+            self.cells[i * self.width:(i + 1) * self.width] = cells[start:start + self.width].translate(CLEAR_VISITED)
+
+    # Places S on the first open cell in reading order and E on the open cell
+    # farthest from it. With exact, S moves to that far cell and E to the one
+    # farthest from there instead; in a perfect maze the second search always
+    # ends a longest path, so S and E are its two ends.
+    def findLongestPath(self, exact=False):
+        width = len(self.mazeDisplay[0])
+        grid = ''.join(''.join(row) for row in self.mazeDisplay)
+
+        start = grid.index(self.blankSpace)
+        end = self.findFurthest(grid, width, start)
+
+        if exact:
+            start, end = end, self.findFurthest(grid, width, end)
+
+        self.startCoords = Coordinates(start % width, start // width)
+        self.setStart(self.startCoords)
+        self.setEnd(Coordinates(end % width, end // width))
+
+    # Breadth first search over the flattened display from start. The display
+    # has a solid border, so neighbours never fall off the grid. Returns the
+    # open cell farthest from start, the first in reading order on a tie.
+    def findFurthest(self, grid, width, start):
+        visited = bytearray(grid.encode().translate(OPEN_CELLS))
+        distance = {start: 0}
+        queue = deque([start])
+        visited[start] = 1
+
+        furthest = start
+        maxDistance = 0
 
-        if len(validNeighbors) == 0:
-            return None
-        else:
-            return validNeighbors[0]
+        while queue:
+            cur = queue.popleft()
+            nextDistance = distance.pop(cur) + 1
 
-        return None
+            for nextCell in (cur - width, cur + width, cur - 1, cur + 1):
+                if visited[nextCell]:
+                    continue
 
-    def createMaze(self):
-        startNode = self.getNode(self.startCoords)
-        startNode.mark()
+                visited[nextCell] = 1
+                distance[nextCell] = nextDistance
+                queue.append(nextCell)
 
-        path = []
+                if nextDistance > maxDistance or (nextDistance == maxDistance and nextCell < furthest):
+                    maxDistance = nextDistance
+                    furthest = nextCell
 
-        path.append(startNode)
+        return furthest
 
-        while len(path) > 0:
+# One row of a display held in a buffer, indexable like a mazeDisplay row
+class MazeRow:
+    def __init__(self, buffer, offset, length):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
 
-            curNode = path[0]
+    def __len__(self):
+        return self.length
 
-            nextNode = self.checkForUnvisitedNeighbors(curNode) 
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self.length)
+            return self.buffer[self.offset + start:self.offset + stop:step].decode()
 
-            if nextNode is not None:
-                nextNode = self.getNode(nextNode) # Maybe redundant get?
-                nextNode.addConnections(path[0])
-                path[0].addConnections(nextNode)
-                nextNode.mark()
-                path.insert(0, nextNode)
-            else:
-                path.pop(0)
+        if idx < 0 or idx >= self.length:
+            raise IndexError('maze column out of range')
 
-    def findLongestPath(self):
-        visited = []
-        distance = []
-        path = []
-        firstNode = False
+        return chr(self.buffer[self.offset + idx])
 
-        for i in range(len(self.mazeDisplay)):
-            tempRow = []
-            tDistance = []
-            for j in range(len(self.mazeDisplay[i])):
-                if self.mazeDisplay[i][j] == ' ':
-                    if firstNode == False:
-                        firstNode = Coordinates(j, i)
-                        self.setStart(firstNode)
-                        tempRow.append(True)
-                        tDistance.append(0)
-                    else:
-                        tempRow.append(False)
-                        tDistance.append(-1)
-                else:
-                    tempRow.append(True)
-                    tDistance.append(-1)
-            visited.append(tempRow)
-            distance.append(tDistance)
-    
-        path.append(firstNode)
-        self.startCoords = firstNode
-        furthestNeighbor = Coordinates(0, 0)
-        longestPathLength = 0
+    def __setitem__(self, idx, value):
+        if idx < 0 or idx >= self.length:
+            raise IndexError('maze column out of range')
 
-        while len(path) > 0:
-            curNode = path.pop()
-            foundNeighbor = False
+        self.buffer[self.offset + idx] = ord(value)
 
+    def __str__(self):
+        return self[:]
+
+# A display stored as fixed length rows in a buffer (such as a memory-mapped
+# file), standing in for the mazeDisplay list of lists. Rows are only read
+# when they are indexed.
+class MazeRows:
+    def __init__(self, buffer, rowLength):
+        self.buffer = buffer
+        self.rowLength = rowLength
+
+    def __len__(self):
+        return len(self.buffer) // self.rowLength
+
+    def __getitem__(self, idx):
+        if idx < 0 or idx >= len(self):
+            raise IndexError('maze row out of range')
+
+        return MazeRow(self.buffer, idx * self.rowLength, self.rowLength)
+
+# Generates mazes far too big for Maze, one row at a time with Eller's
+# algorithm. Only the sets of the current row are kept in memory: each
+# finished row is drawn straight into a file (a temporary one unless a path is
+# given), which is then memory-mapped so Game only pages in the rows around
+# the player.
+class StreamingMaze:
+    def __init__(self, w, h, path=None):
+        self.width = w
+        self.height = h
+        self.startCoords = Coordinates(1, 1)
 
-            for i in range(len(DIRECTIONS)):
-                nextNode = curNode.addCoords(DIRECTIONS[i])
-                
-                if not nextNode.validCoords(len(self.mazeDisplay[0]), len(self.mazeDisplay)): 
-                    continue
-                
-                if visited[nextNode.y][nextNode.x] == False:
-                    visited[nextNode.y][nextNode.x] = True
-                    path.insert(0, nextNode)
-                    distance[nextNode.y][nextNode.x] = distance[curNode.y][curNode.x] + 1
-                    foundNeighbor = True
-            
-        maxDistance = 0
-        for i in range(len(distance)):
-            for j in range(len(distance[i])):
-                if distance[i][j] > maxDistance:
-                    maxDistance = distance[i][j]
-                    furthestNeighbor = Coordinates(j, i)
-        
-        self.setEnd(furthestNeighbor)
+        self.blankSpace = ' '
+        self.wall = '#'
+
+        self.file = tempfile.TemporaryFile() if path is None else open(path, 'w+b')
+
+        self.createMaze()
+        self.file.flush()
+
+        self.buffer = mmap.mmap(self.file.fileno(), 0)
+        self.mazeDisplay = MazeRows(self.buffer, self.width * 2 + 1)
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    # Each row: cells not yet in a set get a new one, neighbours in different
+    # sets are joined at random, then every set continues down through at
+    # least one random cell. Cells below that get no passage start new sets.
+    # The last row joins every neighbour still apart, which connects the maze.
+    def createMaze(self):
+        width = self.width
+        sets = list(range(width))
+        newSet = width
+        up = bytearray(width)
+
+        self.file.write(self.wall.encode() * (width * 2 + 1))
+
+        # Union-find over the set labels of the current row
+        parent = {}
+
+        def find(label):
+            while label in parent:
+                grandparent = parent[label]
+                if grandparent in parent:
+                    parent[label] = parent[grandparent]
+                label = grandparent
+            return label
+
+        for i in range(self.height):
+            lastRow = i == self.height - 1
+            row = up
+            parent.clear()
+
+            for j in range(width - 1):
+                left = find(sets[j])
+                right = find(sets[j + 1])
+
+                if left != right and (lastRow or random.random() < 0.5):
+                    parent[right] = left
+                    row[j] |= RIGHT
+                    row[j + 1] |= LEFT
+
+            up = bytearray(width)
+
+            if not lastRow:
+                columns = {}
+                for j in range(width):
+                    columns.setdefault(find(sets[j]), []).append(j)
+
+                sets = [None] * width
+                for label, cols in columns.items():
+                    downs = [j for j in cols if random.random() < 0.5] or [random.choice(cols)]
+                    for j in downs:
+                        row[j] |= DOWN
+                        up[j] = UP
+                        sets[j] = label
+
+                for j in range(width):
+                    if sets[j] is None:
+                        sets[j] = newSet
+                        newSet += 1
+
+            for line in drawRow(row):
+                self.file.write(line)
+
+    # Already written while generating
+    def draw(self):
+        return
+
+    # Finding the longest path would need the whole maze in memory, so S and
+    # E go in opposite corners, which a perfect maze always connects
+    def findLongestPath(self):
+        self.setStart(self.startCoords)
+        self.setEnd(Coordinates(self.width * 2 - 1, self.height * 2 - 1))
+
+    def setStart(self, coords):
+        self.mazeDisplay[coords.y][coords.x] = 'S'
+
+    def setEnd(self, coords):
+        self.mazeDisplay[coords.y][coords.x] = 'E'
 
 class Game:
-    def __init__(self, w, h, rot=180):
-        self.maze = Maze(w, h)
+    def __init__(self, w, h, rot=180, streaming=False):
+        self.maze = StreamingMaze(w, h) if streaming else Maze(w, h)
 
         self.initMaze()
         
@@ -301,9 +404,11 @@ class Game:
         self.end = (125, 0, 0)
         self.player = (0, 0, 125)
 
+        self.initColourGrid()
+
         # DEBUG SHOW MAZE
         #self.maze.showMaze()
-        for i in range(len(self.data)):
+        for i in range(len(self.data) if not streaming else 0):
             tStr = ''
             for j in range(len(self.data[i])):
                 tStr = tStr + self.data[i][j]
@@ -315,26 +420,20 @@ class Game:
         self.render()
         while self.winCondition() == False:
             playerMoved = False
-            for event in sense.stick.get_events():
-                #print(event.direction, event.action)
-                if event.action == 'pressed':
-                    if event.direction == 'up':
-                        playerMoved = self.movePlayer(self.moveDirection[0])
-                        break
-                    elif event.direction == 'left':
-                        playerMoved = self.movePlayer(self.moveDirection[1])
-                        break
-                    elif event.direction == 'down':
-                        playerMoved = self.movePlayer(self.moveDirection[2])
-                        break
-                    elif event.direction == 'right':
-                        playerMoved = self.movePlayer(self.moveDirection[3])
-                        break
+            event = sense.stick.wait_for_event()
+            #print(event.direction, event.action)
+            if event.action == 'pressed':
+                if event.direction == 'up':
+                    playerMoved = self.movePlayer(self.moveDirection[0])
+                elif event.direction == 'left':
+                    playerMoved = self.movePlayer(self.moveDirection[1])
+                elif event.direction == 'down':
+                    playerMoved = self.movePlayer(self.moveDirection[2])
+                elif event.direction == 'right':
+                    playerMoved = self.movePlayer(self.moveDirection[3])
                            
             if playerMoved == True:   
                 self.render()
-                
-            sleep(.01)
             
         sense.clear()
         sense.show_message("You Finished!", )
@@ -349,41 +448,44 @@ class Game:
         self.moveDirection.rotate(tempRotation)
 
 
+    # Converts the maze to palette indices once. A StreamingMaze is too big to
+    # convert up front, so its windows are converted as they are read.
+    def initColourGrid(self):
+        self.palette = sense.register_palette('maze', [self.open, self.closed, self.start, self.end, self.player])
+
+        if isinstance(self.maze, StreamingMaze):
+            self.grid = self.maze.buffer
+            self.gridTable = COLOUR_INDEX
+        else:
+            self.grid = ''.join(''.join(row) for row in self.data).encode().translate(COLOUR_INDEX)
+            self.gridTable = None
+
+        self.windows = LRUCache(WINDOW_CACHE_SIZE)
+
+    # The 8x8 view around the player as 64 palette indices, without the player
+    def getWindow(self, origin):
+        window = self.windows.get(origin)
+        if window is not None:
+            return window
+
+        width = len(self.data[0])
+        start = origin[1] * width + origin[0]
+        window = b''.join(self.grid[start + i * width:start + i * width + 8] for i in range(8))
+
+        if self.gridTable is not None:
+            window = window.translate(self.gridTable)
+
+        self.windows.put(origin, window)
+
+        return window
+
     def render(self):
+        x, y = self.getRenderOrigin()
+        window = self.getWindow((x, y))
 
-        renderPixels = []
-        
-        renderBoxMin = self.setRenderBoxMin()
-        renderBoxMax = self.setRenderBoxMax()
-        
-        # Normalize render zone to an 8x8 area, around the Player
-        if renderBoxMax.y - 8 < renderBoxMin.y:
-            if renderBoxMin.y == 0:
-                renderBoxMax.y = 8
-            else:
-                renderBoxMin.y = renderBoxMax.y - 8
+        idx = (self.Player.y - y) * 8 + self.Player.x - x
+        sense.set_pixels_indexed(window[:idx] + PLAYER_INDEX + window[idx + 1:], self.palette)
 
-        if renderBoxMax.x - 8 < renderBoxMin.x:
-            if renderBoxMin.x == 0:
-                renderBoxMax.x = 8
-            else:
-                renderBoxMin.x = renderBoxMax.x - 8
-
-        for i in range(renderBoxMin.y, renderBoxMax.y):
-            for j in range(renderBoxMin.x, renderBoxMax.x):
-                if i == self.Player.y and j == self.Player.x:
-                    renderPixels.append(self.player)
-                elif self.data[i][j] == 'S':
-                    renderPixels.append(self.start)
-                elif self.data[i][j] == 'E':
-                    renderPixels.append(self.end)
-                elif self.data[i][j] == ' ':
-                    renderPixels.append(self.open)
-                elif self.data[i][j] == '#':
-                    renderPixels.append(self.closed)
-        
-        sense.clear()
-        sense.set_pixels(renderPixels)
         return None
 
     def winCondition(self):
@@ -416,17 +518,13 @@ class Game:
 
         return False
 
-    def setRenderBoxMin(self):
-        tX = 0 if self.Player.x - 3 < 0 else self.Player.x - 3
-        tY = 0 if self.Player.y - 4 < 0 else self.Player.y - 4
-
-        return Coordinates(tX, tY)
+    # Top left corner of the 8x8 render zone: 3 columns left and 4 rows above
+    # the Player, kept inside the maze
+    def getRenderOrigin(self):
+        tX = min(max(self.Player.x - 3, 0), len(self.data[0]) - 8)
+        tY = min(max(self.Player.y - 4, 0), len(self.data) - 8)
 
-    def setRenderBoxMax(self):
-        tX = len(self.data[0]) if self.Player.x + 5 > len(self.data[0]) else self.Player.x + 5
-        tY = len(self.data) if self.Player.y + 4 > len(self.data) else self.Player.y + 4
-
-        return Coordinates(tX, tY)
+        return (tX, tY)
     
     def initMaze(self):
         self.maze.draw()
@@ -506,23 +604,19 @@ class Menu:
     def main(self):
         self.refreshScreen()
         while self.shouldStop == False:
-            sleep(.2)
-            for event in sense.stick.get_events():
-                if event.action == 'pressed':
-                    if event.direction == 'up':
-                        self.navMenu(self.rotateDirection[0])
-                        break
-                    elif event.direction == 'left':
-                        self.navMenu(self.rotateDirection[1])
-                        break
-                    elif event.direction == 'down':
-                        self.navMenu(self.rotateDirection[2])
-                        break
-                    elif event.direction == 'right':
-                        self.navMenu(self.rotateDirection[3])
-                        break
+            event = sense.stick.wait_for_event()
+            if event.action == 'pressed':
+                if event.direction == 'up':
+                    self.navMenu(self.rotateDirection[0])
+                elif event.direction == 'left':
+                    self.navMenu(self.rotateDirection[1])
+                elif event.direction == 'down':
+                    self.navMenu(self.rotateDirection[2])
+                elif event.direction == 'right':
+                    self.navMenu(self.rotateDirection[3])
 
     def exitMenu(self):
+        self.sense.cancel_message()
         self.shouldStop = True
 
     def changeWidth(self):
@@ -534,22 +628,17 @@ class Menu:
     def changeDimension(self, dim):
         self.showNumber(self.mazeDimensions[dim])
         while True:
-            sleep(.2)
             dir = None
-            for event in sense.stick.get_events():
-                if event.action == 'pressed':
-                    if event.direction == 'up':
-                        dir = self.rotateDirection[0]
-                        break
-                    elif event.direction == 'left':
-                        dir = self.rotateDirection[1]
-                        break
-                    elif event.direction == 'down':
-                        dir = self.rotateDirection[2]
-                        break
-                    elif event.direction == 'right':
-                        dir = self.rotateDirection[3]
-                        break
+            event = sense.stick.wait_for_event()
+            if event.action == 'pressed':
+                if event.direction == 'up':
+                    dir = self.rotateDirection[0]
+                elif event.direction == 'left':
+                    dir = self.rotateDirection[1]
+                elif event.direction == 'down':
+                    dir = self.rotateDirection[2]
+                elif event.direction == 'right':
+                    dir = self.rotateDirection[3]
  
             if dir == 'UP':
                 if self.mazeDimensions[dim] < 99:
@@ -583,6 +672,8 @@ class Menu:
 
         secondDigit = int(numb % 10)
  
+        self.sense.cancel_message()
+
         # set pixels for the two digits
         pixels = [(0, 0, 0) for i in range(64)]
         digitGlyph = digits0_9[firstDigit]
@@ -596,6 +687,7 @@ class Menu:
         self.sense.set_pixels(pixels)
 
     def runMaze(self):
+        self.sense.cancel_message()
         game = Game(self.mazeDimensions['W'], self.mazeDimensions['H'], self.rotation)
         game.main()
 
@@ -609,7 +701,8 @@ class Menu:
         
         curItem = self.getCurrentMenuItem()
 
-        self.sense.show_message(curItem['TEXT'], .05)
+        # Scroll in the background so joystick input is still read mid-message
+        self.sense.show_message_async(curItem['TEXT'], .05)
 
     def getCurrentMenuItem(self):
         return self.MENUS[self.curMenu][self.curIdx % len(self.MENUS[self.curMenu])]
@@ -635,4 +728,5 @@ class Menu:
                 curItem['FUNC']()
                 return
 
-Menu(sense, lowLight=False)
+if __name__ == '__main__':
+    Menu(sense, lowLight=False)
@@ -1 +1,4 @@
-from .emulator import SenseHat
\ No newline at end of file
+from .emulator import SenseHat
+from .backends import PygameBackend, HeadlessBackend
+from .palette import Palette
+from .replay import ReplaySource, load_recording
@@ -0,0 +1,230 @@
+import os
+import sys
+import threading
+import time
+
+BACKEND_ENV_VAR = 'SENSE_EMU_BACKEND'
+
+# pygame is only imported once a PygameBackend is created, so importing
+# sense_emu stays cheap and headless runs never load SDL at all
+pygame = None
+
+KEY_LOOKUP = {}
+ACT_LOOKUP = {}
+
+sideOffset = 0
+
+SCREEN_WIDTH = 800 + sideOffset
+SCREEN_HEIGHT = 800
+
+_screen = None
+
+def _import_pygame():
+    global pygame
+
+    if pygame is not None:
+        return pygame
+
+    import pygame as pg
+
+    KEY_LOOKUP.update({pg.K_UP: 'up',pg.K_DOWN: 'down',pg.K_LEFT: 'left',pg.K_RIGHT: 'right', pg.K_SPACE: 'middle'})
+    ACT_LOOKUP.update({pg.KEYDOWN: 'pressed', pg.KEYUP: 'released'})
+
+    pygame = pg
+
+    return pygame
+
+def _init_display():
+    global _screen
+
+    if _screen is not None:
+        return _screen
+
+    _import_pygame()
+
+    pygame.init()
+
+    file_name = sys.argv[0].split('/')[-1].replace('.py', '')
+
+    pygame.display.set_caption(f'SenseHat Display Emulator: {file_name}')
+
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(pygame.KEYUP)
+    pygame.event.set_allowed(pygame.KEYDOWN)
+    pygame.event.set_allowed(pygame.QUIT)
+
+    _screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    _screen.fill((125, 125, 125))
+
+    return _screen
+
+# Returns the indices of the cells that differ between two 64-pixel frames.
+# A missing previous frame means every cell has to be drawn.
+def changed_cells(last_frame, frame):
+    if last_frame is None:
+        return range(len(frame))
+
+    return [i for i in range(len(frame)) if frame[i] != last_frame[i]]
+
+class PygameBackend:
+    name = 'pygame'
+
+    # Set by SenseHat.enable_stats. Drawing the cell rectangles is timed as
+    # 'draw' and pygame.display.update as 'flip'.
+    stats = None
+
+    def __init__(self):
+        self._screen = _init_display()
+        self._last_frame = None
+
+        self.repainted_cells = 0
+        self.last_repainted = 0
+
+        self._pixel_block_offset = (self._screen.get_width() / 8)
+        self._pixel_block_size = self._pixel_block_offset * 0.9
+        self._pixel_block_spacing = self._pixel_block_offset * .05
+
+    def _cell_rect(self, x, y):
+        return pygame.Rect(
+            x*self._pixel_block_offset+self._pixel_block_spacing,
+            y*self._pixel_block_offset+self._pixel_block_spacing,
+            self._pixel_block_size,
+            self._pixel_block_size
+            )
+
+    def draw_pixels(self, pixels):
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+
+        frame = [tuple(p) for p in pixels]
+        dirty = []
+
+        for i in changed_cells(self._last_frame, frame):
+            rect = self._cell_rect(i % 8, i // 8)
+            pygame.draw.rect(self._screen, frame[i], rect)
+            dirty.append(rect)
+
+        self._last_frame = frame
+        self.last_repainted = len(dirty)
+        self.repainted_cells += len(dirty)
+
+        if stats is not None:
+            drawn = time.perf_counter_ns()
+            stats.record('draw', drawn - start)
+
+        if dirty:
+            pygame.display.update(dirty)
+
+            if stats is not None:
+                stats.record('flip', time.perf_counter_ns() - drawn)
+
+    # Returns (direction, action) for joystick keys and None for anything else
+    def _convert_event(self, event):
+        if (event.type == pygame.KEYDOWN or event.type == pygame.KEYUP) and event.key in KEY_LOOKUP:
+            return (KEY_LOOKUP[event.key], ACT_LOOKUP[event.type])
+
+        elif event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            exit()
+
+        return None
+
+    def poll_events(self):
+        events = []
+
+        for event in pygame.event.get():
+            stick_event = self._convert_event(event)
+            if stick_event is not None:
+                events.append(stick_event)
+
+        return events
+
+    # Blocks in pygame.event.wait until a joystick event arrives, returning
+    # None if timeout seconds pass first
+    def wait_event(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if deadline is None:
+                event = pygame.event.wait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                event = pygame.event.wait(max(1, int(remaining * 1000)))
+
+            if event.type == pygame.NOEVENT:
+                continue
+
+            stick_event = self._convert_event(event)
+            if stick_event is not None:
+                return stick_event
+
+# Keeps the last presented frame in memory and never touches SDL, so scripts
+# can run on machines without a display and push frames as fast as Python allows.
+class HeadlessBackend:
+    name = 'headless'
+
+    # Set by SenseHat.enable_stats. There is no display to flip, so only
+    # 'draw' is recorded.
+    stats = None
+
+    def __init__(self):
+        self.pixels = None
+        self.frame_count = 0
+        self._events = []
+        self._events_changed = threading.Condition()
+
+        self.repainted_cells = 0
+        self.last_repainted = 0
+
+    def draw_pixels(self, pixels):
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter_ns()
+
+        frame = [tuple(p) for p in pixels]
+
+        self.last_repainted = len(changed_cells(self.pixels, frame))
+        self.repainted_cells += self.last_repainted
+
+        self.pixels = frame
+        self.frame_count += 1
+
+        if stats is not None:
+            stats.record('draw', time.perf_counter_ns() - start)
+
+    def push_event(self, direction, action='pressed'):
+        with self._events_changed:
+            self._events.append((direction, action))
+            self._events_changed.notify()
+
+    def poll_events(self):
+        with self._events_changed:
+            events = self._events
+            self._events = []
+        return events
+
+    def wait_event(self, timeout=None):
+        with self._events_changed:
+            if not self._events_changed.wait_for(lambda: self._events, timeout):
+                return None
+            return self._events.pop(0)
+
+BACKENDS = {
+    PygameBackend.name: PygameBackend,
+    HeadlessBackend.name: HeadlessBackend,
+}
+
+def create_backend(backend=None):
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV_VAR, PygameBackend.name)
+
+    if not isinstance(backend, str):
+        return backend
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown display backend '{backend}', expected one of {tuple(BACKENDS)}")
+
+    return BACKENDS[backend]()
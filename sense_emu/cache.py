@@ -0,0 +1,50 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Least recently used cache with a fixed entry bound. A maxsize of 0 disables
+# storing entirely while still counting misses.
+class LRUCache:
+    def __init__(self, maxsize=32):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError('Cache size must be a non-negative integer')
+
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        if self._maxsize == 0:
+            return
+
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self):
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,153 @@
+import os
+import queue
+import threading
+import time
+
+from itertools import chain
+
+FRAME_BYTES = 64 * 3
+
+def frame_to_bytes(pixels):
+    return bytes(chain.from_iterable(pixels))
+
+# Appends each frame as 192 raw RGB bytes with no header, so a capture can be
+# memory-mapped as an (n, 8, 8, 3) uint8 array for analysis.
+class RawFrameSink:
+    def __init__(self, path):
+        self._file = open(path, 'ab')
+
+    def write_frame(self, timestamp, data):
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+# Writes raw frames to an already open binary stream such as a subprocess
+# stdin, flushing after each one so the reader sees frames as they happen.
+class PipeSink:
+    def __init__(self, stream, close_stream=False):
+        self._stream = stream
+        self._close_stream = close_stream
+
+    def write_frame(self, timestamp, data):
+        self._stream.write(data)
+        self._stream.flush()
+
+    def close(self):
+        if self._close_stream:
+            self._stream.close()
+
+# Collects frames and saves them as an animated GIF, or an APNG when the path
+# ends in .png, on close. Each frame is shown for as long as it was on screen
+# and scaled up so the 8x8 display is visible.
+class AnimationSink:
+    def __init__(self, path, scale=32, loop=0):
+        self._path = path
+        self._scale = scale
+        self._loop = loop
+        self._frames = []
+
+    def write_frame(self, timestamp, data):
+        self._frames.append((timestamp, data))
+
+    def close(self):
+        if len(self._frames) == 0:
+            return
+
+        from PIL import Image
+
+        size = (8 * self._scale, 8 * self._scale)
+        images = []
+        durations = []
+
+        for i, (timestamp, data) in enumerate(self._frames):
+            img = Image.frombytes('RGB', (8, 8), data).resize(size, Image.NEAREST)
+            images.append(img)
+
+            if i + 1 < len(self._frames):
+                durations.append(max(20, int((self._frames[i + 1][0] - timestamp) * 1000)))
+            else:
+                durations.append(1000)
+
+        images[0].save(
+            self._path,
+            save_all=True,
+            append_images=images[1:],
+            duration=durations,
+            loop=self._loop,
+        )
+
+def create_sink(sink):
+    if not isinstance(sink, str):
+        return sink
+
+    if os.path.splitext(sink)[1].lower() in ('.gif', '.png'):
+        return AnimationSink(sink)
+
+    return RawFrameSink(sink)
+
+# Hands presented frames to a sink on a background writer thread. submit()
+# never blocks the render path: when the bounded queue is full the frame is
+# dropped and counted instead. If the sink fails (say a BrokenPipeError from a
+# PipeSink) the error is kept in error, later frames are dropped, and close()
+# raises it.
+class FrameCapture:
+    def __init__(self, sink, queue_size=256):
+        self._sink = create_sink(sink)
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._closed = False
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.error = None
+
+        self._thread.start()
+
+    def submit(self, pixels):
+        if self.error is not None:
+            self.dropped_frames += 1
+            return
+
+        try:
+            self._queue.put_nowait((time.monotonic(), frame_to_bytes(pixels)))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+
+        # The writer may die while the queue is full, so never block on it
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+        self._thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+
+                if item is None:
+                    return
+
+                self._sink.write_frame(*item)
+                self.captured_frames += 1
+        except Exception as exc:
+            self.error = exc
+        finally:
+            try:
+                self._sink.close()
+            except Exception as exc:
+                if self.error is None:
+                    self.error = exc
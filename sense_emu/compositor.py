@@ -0,0 +1,82 @@
+import threading
+import time
+
+# Coalesces frame presents. Writes only replace the pending frame; a background
+# thread presents whatever is pending once per frame tick, so any number of
+# writes between two ticks cost a single draw. A max_fps of 0 never presents
+# on its own and leaves it to explicit flush() calls.
+class Compositor:
+    def __init__(self, draw, max_fps):
+        if not isinstance(max_fps, (int, float)) or max_fps < 0:
+            raise ValueError('max_fps must be a non-negative number')
+
+        self._draw = draw
+        self._interval = 1 / max_fps if max_fps else None
+        self._pending = None
+        self._running = True
+        self._cond = threading.Condition()
+
+        # Held from taking the pending frame until it is drawn, so a frame
+        # taken by one flush can never be drawn over a newer one
+        self._present_lock = threading.Lock()
+
+        self.presented_frames = 0
+        self.coalesced_frames = 0
+
+        self._thread = None
+        if self._interval is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def submit(self, pixels):
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced_frames += 1
+
+            self._pending = pixels
+            self._cond.notify()
+
+    def flush(self):
+        with self._present_lock:
+            with self._cond:
+                pixels = self._pending
+                self._pending = None
+
+            if pixels is None:
+                return False
+
+            self._draw(pixels)
+            self.presented_frames += 1
+
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+
+                if not self._running:
+                    return
+
+                # Wait for the next tick so writes made in the meantime coalesce
+                now = time.monotonic()
+                next_tick = (now // self._interval + 1) * self._interval
+                while now < next_tick and self._running:
+                    self._cond.wait(next_tick - now)
+                    now = time.monotonic()
+
+                if not self._running:
+                    return
+
+            self.flush()
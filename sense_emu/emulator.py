@@ -1,92 +1,43 @@
-from PIL import Image
-
 import os
-import sys
-import pygame
 import math
 import time
-
-from pygame.locals import (
-    K_UP,
-    K_DOWN,
-    K_LEFT,
-    K_RIGHT,
-    K_SPACE,
-    K_ESCAPE,
-    KEYUP,
-    KEYDOWN,
-    QUIT,
-)
-
-pygame.init()
-
-FILE_NAME = sys.argv[0].split('/')[-1].replace('.py', '')
-
-pygame.display.set_caption(f'SenseHat Display Emulator: {FILE_NAME}')
-
-pygame.event.set_blocked(None)
-pygame.event.set_allowed(KEYUP)
-pygame.event.set_allowed(KEYDOWN)
-pygame.event.set_allowed(QUIT)
-
-
-sideOffset = 0
-
-SCREEN_WIDTH = 800 + sideOffset
-SCREEN_HEIGHT = 800
-
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-
-screen.fill((125, 125, 125))
-
-KEY_LOOKUP = {K_UP: 'up',K_DOWN: 'down',K_LEFT: 'left',K_RIGHT: 'right', K_SPACE: 'middle'}
-ACT_LOOKUP = {KEYDOWN: 'pressed', KEYUP: 'released'}
-
-class StickEvent:
-    def __init__(self, dir, act):
-        self.direction = dir
-        self.action = act
-        self.time = time.time()
-   
-    def __str__(self):
-        return f"(timestamp: {self.time}, direction: {self.direction}, action: {self.action})"
-
-    def __repr__(self):
-         return f"(timestamp: {self.time}, direction: {self.direction}, action: {self.action})"
-
-class Stick:
-    def __init__(self):
-        self._events = []
-
-    def get_events(self):
-        for event in pygame.event.get():
-            if (event.type == KEYDOWN or event.type == KEYUP) and event.key in [K_UP,K_DOWN,K_LEFT,K_RIGHT, K_SPACE]:
-                self._events.append(StickEvent(KEY_LOOKUP[event.key], ACT_LOOKUP[event.type]))
-
-            elif event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                exit()
-    
-        tempCopy = self._events.copy()
-        
-        self._events = []
-
-        return tempCopy
+import threading
+
+from contextlib import contextmanager
+
+from .backends import create_backend
+from .cache import LRUCache
+from .capture import FrameCapture
+from .compositor import Compositor
+from .font import load_atlas, render_rows
+from .framebuffer import create_framebuffer, rotate_ccw, rotate_cw, rotate_frame, validate_rgb
+from .images import decode_frames, decode_image, image_key
+from .palette import Palette
+from .scroll import MessageScroll
+from .stats import RenderStats
+from .stick import Stick, StickEvent
 
 class SenseHat:
-    def __init__(self, text_assets='sense_hat_text'):
-        self._pixels = []
+    def __init__(self, text_assets='sense_hat_text', backend=None, framebuffer=None, message_cache_size=32, max_fps=None, stick_capacity=64, stick_overflow='drop_oldest', image_cache_size=32):
         self._rotation = 0
-        self._stick = Stick()
-
-        self._pixel_block_offset = (screen.get_width() / 8)
-        self._pixel_block_size = self._pixel_block_offset * 0.9
-        self._pixel_block_spacing = self._pixel_block_offset * .05
-
-        for _ in range(64):
-            self._pixels.append((0, 0, 0))
+        self._fb = create_framebuffer(framebuffer)
+        self._backend = create_backend(backend)
+        self._stick = Stick(self._backend, stick_capacity, stick_overflow)
+        self._message_cache = LRUCache(message_cache_size)
+        self._image_cache = LRUCache(image_cache_size)
+        self._scroll = None
+        self._lock = threading.RLock()
+        self._compositor = None
+        self._batch_depth = 0
+        self._batch_pending = None
+        self._capture = None
+        self._stats = None
+        self._palettes = {}
 
         self._set_pixels()
 
+        self.set_max_fps(max_fps)
+
         dir_path = os.path.dirname(__file__)
         self._load_text(
             os.path.join(dir_path, f"{text_assets}.png"),
@@ -97,6 +48,10 @@ class SenseHat:
     def stick(self):
         return self._stick
 
+    @property
+    def backend(self):
+        return self._backend
+
     @property
     def rotation(self):
         return self._rotation
@@ -106,47 +61,185 @@ class SenseHat:
         self.set_rotation(r, True)
 
     def get_pixel(self, x, y):
-        if self._coords_are_valid(x, y) == False:
-            raise Exception(f"Coords provided are out of bounds: ({x} {y})")
-
         u_coords = self._convert_to_unary(x, y)
 
-        return self._pixels[u_coords]
+        return self._fb.get_pixel(u_coords)
 
     def get_pixels(self):
-        return self._pixels
+        return self._fb.get_pixels()
 
     def set_pixel(self, x, y, *args):
 
-        if self._coords_are_valid(x, y) == False:
-            raise Exception(f"Coords provided are out of bounds: ({x} {y})")
+        u_coords = self._convert_to_unary(x, y)
 
         color_val = self._unpack_rgb(*args)
 
-        self._validate_rgb(color_val)
-
-        u_coords = self._convert_to_unary(x, y)
+        self._timed('validate', self._validate_rgb, color_val)
 
-        self._pixels[u_coords] = color_val
+        self._fb.set_pixel(u_coords, color_val)
 
-        self._set_pixel(x, y, color_val)
+        self._set_pixels()
 
         return
 
     def set_pixels(self, pixel_ara):
 
-        if len(pixel_ara) != 64:
-            raise Exception("Pixel List must be of length 64.")
-        
-        for pixel in pixel_ara:
-            self._validate_rgb(pixel)
-
-        self._pixels = pixel_ara
+        self._timed('validate', self._fb.set_pixels, pixel_ara)
 
         self._set_pixels()
 
         return
 
+    # Validates colours once and stores them under name, so frames can be
+    # given to set_pixels_indexed as palette indices
+    def register_palette(self, name, colours):
+        palette = colours if isinstance(colours, Palette) else Palette(colours)
+        self._palettes[name] = palette
+
+        return palette
+
+    def get_palette(self, name):
+        try:
+            return self._palettes[name]
+        except KeyError:
+            raise ValueError(f"Unknown palette '{name}'")
+
+    # Trusted fast path for set_pixels: indices is 64 palette indices into a
+    # Palette or the name of a registered one. The colours were validated when
+    # the palette was built, so only the indices are checked. A bytes frame is
+    # stored as is and expanded only when presented; other buffers and lists
+    # are copied into bytes once so later writes to them can't leak in. A
+    # frame identical to the one already shown is not presented again.
+    def set_pixels_indexed(self, indices, palette):
+        if not isinstance(palette, Palette):
+            palette = self.get_palette(palette)
+
+        if type(indices) is not bytes:
+            # bytes(n) would make n zero indices rather than reject it
+            if isinstance(indices, int):
+                raise Exception("Pixel List must be of length 64.")
+
+            try:
+                indices = bytes(indices)
+            except ValueError:
+                bad = next(i for i in indices if not 0 <= i <= 255)
+                raise Exception(f"Palette index out of range: {bad}")
+
+        if self._fb.store_indexed(indices, palette, self._rotation):
+            self._set_pixels()
+
+    # Switches to compositor mode: pixel writes only update the framebuffer and
+    # at most max_fps frames per second are presented, each showing the latest
+    # state. With max_fps=0 frames are only presented by flush(), and None
+    # goes back to presenting every write immediately.
+    def set_max_fps(self, max_fps):
+        if self._compositor is not None:
+            self._compositor.stop()
+            self._compositor = None
+
+        if max_fps is not None:
+            self._compositor = Compositor(self._draw, max_fps)
+
+    def flush(self):
+        if self._compositor is not None:
+            self._compositor.flush()
+
+    # Applies an iterable of (x, y, colour) writes and presents once. Every
+    # write is validated before any is applied, so a bad entry changes nothing.
+    def set_pixels_sparse(self, updates):
+        writes = []
+
+        for x, y, color_val in updates:
+            u_coords = self._convert_to_unary(x, y)
+            self._validate_rgb(color_val)
+            writes.append((u_coords, color_val))
+
+        for u_coords, color_val in writes:
+            self._fb.set_pixel(u_coords, color_val)
+
+        self._set_pixels()
+
+    # Defers every present made inside the block and shows only the final
+    # frame when the outermost batch exits.
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+
+            if self._batch_depth == 0 and self._batch_pending is not None:
+                pixels = self._batch_pending
+                self._batch_pending = None
+                self._present(pixels)
+
+    # Records every presented frame to sink: a path (.gif/.png for an animation,
+    # anything else for raw 192 byte frames) or an object with write_frame and
+    # close. Frames are written on a background thread; stop_capture() raises
+    # the sink's error if it failed along the way.
+    def start_capture(self, sink, queue_size=256):
+        self.stop_capture()
+        self._capture = FrameCapture(sink, queue_size)
+
+        return self._capture
+
+    def stop_capture(self):
+        capture = self._capture
+        self._capture = None
+
+        if capture is not None:
+            capture.close()
+
+        return capture
+
+    # Starts collecting render counters and timings, read back with stats().
+    # Nothing is measured while stats are disabled. With dump_interval set, a
+    # snapshot is passed to dump (printed to stderr by default) periodically.
+    def enable_stats(self, dump_interval=None, dump=None):
+        self.disable_stats()
+        self._stats = RenderStats(self._dropped_counts, dump_interval, dump)
+
+        # Backends with a stats attribute time their own draw and flip phases;
+        # any other backend's draw_pixels is timed as a whole as 'draw'
+        if hasattr(self._backend, 'stats'):
+            self._backend.stats = self._stats
+
+        return self._stats
+
+    def disable_stats(self):
+        stats = self._stats
+        self._stats = None
+
+        if hasattr(self._backend, 'stats'):
+            self._backend.stats = None
+
+        if stats is not None:
+            stats.stop()
+
+        return stats
+
+    # Returns a snapshot dict of frames presented, pixels changed, dropped
+    # frames and events, and timing histograms for the validate, rotate,
+    # mirror (flip_h/flip_v), draw and flip (display update) phases, or None
+    # if stats are disabled.
+    def stats(self):
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot()
+
+    def _dropped_counts(self):
+        compositor = self._compositor
+        capture = self._capture
+
+        return {
+            'coalesced_frames': 0 if compositor is None else compositor.coalesced_frames,
+            'capture_frames': 0 if capture is None else capture.dropped_frames,
+            'stick_events': self._stick.dropped_events,
+        }
+
     def set_rotation(self, rot=0, redraw=True):
         if not isinstance(rot, int) or rot < 0 or rot > 270 or rot % 90 != 0:
             raise ValueError('Rotation must be an integer value of (0, 90, 180, 270)')
@@ -163,43 +256,93 @@ class SenseHat:
         if len(letter) > 1:
             raise ValueError('Only one character may be passed to this method.')
 
-        dummy_color = back_colour
-        pixel_list = [dummy_color] * 8
-        pixel_list.extend(self._get_char_pixels(letter))
-        pixel_list.extend([dummy_color] * 16)
-        colored_pixels = [
-            text_colour if pixel == [255, 255, 255] else back_colour
-            for pixel in pixel_list
-        ]
+        rows = [0]
+        rows.extend(self._atlas.rows(letter))
+        rows.extend([0, 0])
+        colored_pixels = render_rows(rows, text_colour, back_colour)
         colored_pixels = self._rotate_pixels_CCW(colored_pixels, back_colour)
         self.set_pixels(colored_pixels)
 
     def show_message(self, text, scroll_speed=.1, text_colour=[255, 255, 255], back_colour=[0, 0, 0]):
-       
-        dummy_color = back_colour
-        string_padding = [dummy_color] * 64
-        letter_padding = [dummy_color] * 8
 
-        scroll_pixels = []
-        scroll_pixels.extend(string_padding)
+        frames = self._render_message(text, text_colour, back_colour)
+
+        self.cancel_message()
+
+        for pixels, display_pixels in frames:
+            with self._lock:
+                self._fb.store(pixels)
+                self._present(display_pixels)
+            time.sleep(scroll_speed)
+
+    # Starts scrolling the message in the background and returns immediately
+    # with a MessageScroll handle. A message already scrolling is cancelled
+    # and replaced.
+    def show_message_async(self, text, scroll_speed=.1, text_colour=[255, 255, 255], back_colour=[0, 0, 0]):
+
+        frames = self._render_message(text, text_colour, back_colour)
+
+        previous = self._scroll
+        if previous is not None:
+            previous.cancel()
+
+        self._scroll = MessageScroll(frames, scroll_speed, self._show_scroll_frame, previous).start()
+
+        return self._scroll
+
+    def cancel_message(self):
+        if self._scroll is not None:
+            self._scroll.cancel()
+            self._scroll = None
+
+    def message_cache_info(self):
+        return self._message_cache.info()
+
+    def clear_message_cache(self):
+        self._message_cache.clear()
+
+    # Returns every scroll frame of a message as (pixels, display_pixels) pairs,
+    # the latter already rotated for presenting. Results are cached per text,
+    # colours and rotation, so repeated messages skip rendering entirely.
+    def _render_message(self, text, text_colour, back_colour):
+        self._validate_rgb(text_colour)
+        self._validate_rgb(back_colour)
+
+        text_colour = tuple(text_colour)
+        back_colour = tuple(back_colour)
+
+        key = (text, text_colour, back_colour, self._rotation)
+        frames = self._message_cache.get(key)
+
+        if frames is not None:
+            return frames
+
+        string_padding = [0] * 8
+
+        scroll_rows = []
+        scroll_rows.extend(string_padding)
 
         for s in text:
-            scroll_pixels.extend(self._trim_whitespace(self._get_char_pixels(s)))
-            scroll_pixels.extend(letter_padding)
+            scroll_rows.extend(self._atlas.trimmed_rows(s))
+            scroll_rows.append(0)
 
-        scroll_pixels.extend(string_padding)
+        scroll_rows.extend(string_padding)
 
-        colored_pixels = [
-            text_colour if pixel == [255, 255, 255] else back_colour
-            for pixel in scroll_pixels
-        ]
+        colored_pixels = render_rows(scroll_rows, text_colour, back_colour)
+
+        frames = []
 
         scroll_length = len(colored_pixels) // 8
         for i in range(scroll_length - 8):
             start = i * 8
             end = start + 64
-            self.set_pixels(self._rotate_pixels_CCW(colored_pixels[start:end], back_colour))
-            time.sleep(scroll_speed)
+            pixels = self._rotate_pixels_CCW(colored_pixels[start:end], back_colour)
+            frames.append((tuple(pixels), rotate_frame(pixels, self._rotation)))
+
+        frames = tuple(frames)
+        self._message_cache.put(key, frames)
+
+        return frames
 
     def clear(self, *args):
         if len(args) == 0:
@@ -219,42 +362,57 @@ class SenseHat:
 
     def load_image(self, file_path, redraw=True):
 
-        if not os.path.exists(file_path):
-            raise IOError(f"{file_path} is not found")
-
-        img = Image.open(file_path).convert('RGB')
-        img_pixels = list(map(list, img.getdata()))
+        img_pixels = list(map(list, self._decode_cached('image', decode_image, file_path)))
 
+        # Decoded pixels are always valid RGB, only the size needs checking
         if redraw:
-            self.set_pixels(img_pixels)   
+            if len(img_pixels) != 64:
+                raise Exception("Pixel List must be of length 64.")
+
+            self._fb.store(img_pixels)
+            self._set_pixels()
 
-        return img_pixels 
+        return img_pixels
+
+    # Decodes a sprite sheet (split into 8x8 tiles) or every frame of an
+    # animated GIF in one go. The frames are tuples of RGB tuples, shared with
+    # the cache, and can be passed to set_pixels as they are.
+    def load_frames(self, file_path):
+        return list(self._decode_cached('frames', decode_frames, file_path))
+
+    def image_cache_info(self):
+        return self._image_cache.info()
+
+    def clear_image_cache(self):
+        self._image_cache.clear()
+
+    # Decoded images are cached by path, modification time and size, so
+    # reloading an unchanged file every frame skips PIL entirely
+    def _decode_cached(self, kind, decode, file_path):
+        key = (kind,) + image_key(file_path)
+
+        decoded = self._image_cache.get(key)
+        if decoded is None:
+            decoded = decode(file_path)
+            self._image_cache.put(key, decoded)
+
+        return decoded
 
     def flip_h(self, redraw=True):
-        pixel_list = self.get_pixels()
-        flipped_list = []
+        if not redraw:
+            return self._fb.to_list(self._fb.flip_h())
 
-        for i in range(8):
-            offset = i * 8
-            flipped_list.extend(reversed(pixel_list[offset:offset + 8]))
-    
-        if redraw:
-            self.set_pixels(flipped_list)
+        self._present(self._timed('mirror', self._fb.apply_flip_h, self._rotation))
 
-        return flipped_list
+        return self.get_pixels()
 
     def flip_v(self, redraw=True):
-        pixel_list = self.get_pixels()
-        flipped_list = []
+        if not redraw:
+            return self._fb.to_list(self._fb.flip_v())
 
-        for i in reversed(range(8)):
-            offset = i * 8
-            flipped_list.extend(pixel_list[offset:offset + 8])
-        
-        if redraw:
-            self.set_pixels(flipped_list)
+        self._present(self._timed('mirror', self._fb.apply_flip_v, self._rotation))
 
-        return flipped_list
+        return self.get_pixels()
 
     def _convert_from_unary(self, u):
 
@@ -278,35 +436,14 @@ class SenseHat:
     def _coords_are_valid(self, x, y):
         return 0 <= x <= 7 and 0 <= y <= 7
 
-    def _get_char_pixels(self, c):
-        if len(c) == 1 and c in self._text_dict.keys():
-            return list(self._text_dict[c])
-        else:
-            return list(self._text_dict['?'])
-
     def _load_text(self, img_file, txt_file):
-        
-        img_pixels = self.load_image(img_file, False)
-
-        with open(txt_file, 'r') as f:
-            loaded_txt = f.read()
-
-        self._text_dict = {}
-
-        for idx, s in enumerate(loaded_txt):
-            start = idx * 40
-            end = start + 40
-            char = img_pixels[start:end]
-            self._text_dict[s] = char
+        self._atlas = load_atlas(img_file, txt_file)
 
     def _fill_pixels(self, color):
 
         self._validate_rgb(color)
 
-        self._pixels = []
-
-        for _ in range(64):
-            self._pixels.append(color)
+        self._fb.fill(color)
 
         return
 
@@ -326,83 +463,69 @@ class SenseHat:
         return flat_ara
 
     def _rotate_pixels_CW(self, matrix, back_color=[0, 0, 0]):
-        size = int(math.sqrt(len(matrix)))
-        result = [back_color] * 64
-        
-        for i in range(size):
-            for j in range(size):
-                result[i * size + j] = matrix[(size - j - 1) * size + i]
+        return rotate_cw(matrix)
 
+    def _rotate_pixels_CCW(self, matrix, back_color=[0, 0, 0]):
+        return rotate_ccw(matrix)
 
-        return result 
+    def _set_pixels(self):
+        self._present(self._timed('rotate', self._fb.rotated, self._rotation))
+
+    def _timed(self, phase, func, *args):
+        stats = self._stats
+        if stats is None:
+            return func(*args)
+
+        start = time.perf_counter_ns()
+        try:
+            return func(*args)
+        finally:
+            stats.record(phase, time.perf_counter_ns() - start)
+
+    def _present(self, pixels):
+        if self._batch_depth > 0:
+            self._batch_pending = pixels
+            return
 
-    def _rotate_pixels_CCW(self, matrix, back_color=[0, 0, 0]):
-        size = int(math.sqrt(len(matrix)))
-        result = [back_color] * 64
-        
-        for i in range(size):
-            for j in range(size):
-                result[(size - j - 1) * size + i] = matrix[i * size + j]
+        if self._compositor is not None:
+            self._compositor.submit(pixels)
+            return
 
+        self._draw(pixels)
 
-        return result 
+    def _draw(self, pixels):
+        # disable_stats and stop_capture can run on another thread while the
+        # compositor draws, so each is read once
+        stats = self._stats
+        capture = self._capture
 
-    def _rotate_pixels(self, pixels):
-        if self._rotation == 90:
-            return self._rotate_pixels_CW(pixels)
-        elif self._rotation == 180:
-            return self._rotate_pixels_CW(self._rotate_pixels_CW(pixels))
-        elif self._rotation == 270:
-            return self._rotate_pixels_CCW(self._rotate_pixels_CCW(pixels))
-        
-        return pixels
+        with self._lock:
+            if stats is None or hasattr(self._backend, 'stats'):
+                self._backend.draw_pixels(pixels)
+            else:
+                start = time.perf_counter_ns()
+                self._backend.draw_pixels(pixels)
+                stats.record('draw', time.perf_counter_ns() - start)
 
-    def _set_pixel(self, x, y, color_val):
+            if stats is not None:
+                # Custom backends need not count the cells they repaint
+                stats.record_frame(getattr(self._backend, 'last_repainted', 0))
 
-        rect = pygame.Rect(
-            x*self._pixel_block_offset+self._pixel_block_spacing,
-            y*self._pixel_block_offset+self._pixel_block_spacing,
-            self._pixel_block_size,
-            self._pixel_block_size
-            )
-        pygame.draw.rect(screen, color_val, rect)
+            if capture is not None:
+                capture.submit(pixels)
 
-        pygame.display.update()
+    # Called from the MessageScroll thread. The cancel flag is checked under the
+    # lock so a cancelled scroll never draws over whatever replaced it.
+    def _show_scroll_frame(self, frame, cancelled):
+        with self._lock:
+            if cancelled.is_set():
+                return False
 
-        return
+            pixels, display_pixels = frame
+            self._fb.store(pixels)
+            self._present(display_pixels)
 
-    def _set_pixels(self):
-        pixels = self._rotate_pixels(self._pixels.copy())
-        for i in range(len(pixels)):
-            x,y = self._convert_from_unary(i)
-
-            rect = pygame.Rect(
-                x*self._pixel_block_offset+self._pixel_block_spacing,
-                y*self._pixel_block_offset+self._pixel_block_spacing,
-                self._pixel_block_size,
-                self._pixel_block_size
-                )
-
-            pygame.draw.rect(screen, pixels[i], rect)
-
-        pygame.display.update()
-
-    def _trim_whitespace(self, char):
-        psum = lambda x: sum(sum(x, []))
-        if psum(char) > 0:
-            is_empty = True
-            while is_empty:
-                row = char[0:8]
-                is_empty = psum(row) == 0
-                if is_empty:
-                    del char[0:8]
-            is_empty = True
-            while is_empty:
-                row = char[-8:]
-                is_empty = psum(row) == 0
-                if is_empty:
-                    del char[-8:]
-        return char
+        return True
 
     def _unpack_rgb(self, *args):
         if len(args) == 1:
@@ -411,11 +534,4 @@ class SenseHat:
         return args
 
     def _validate_rgb(self, color):
-        if len(color) != 3:
-            raise Exception(f"Invalid RGB array {color}")
-        
-        for c in color:
-            if (0 <= c <= 255) == False or isinstance(c, int) == False:
-                raise Exception(f"Invalid RGB values {color}")
-        
-        return True
+        return validate_rgb(color)
@@ -0,0 +1,143 @@
+import os
+
+ATLAS_VERSION = 1
+
+# Glyphs in the font image are 5 rows of 8 pixels, stored sideways
+GLYPH_ROWS = 5
+GLYPH_PIXELS = GLYPH_ROWS * 8
+
+_atlases = {}
+
+# Font compiled into one bitmask per glyph. Each glyph is a list of row masks
+# (bit i set means pixel i of that row is lit) plus the first and last+1 row
+# that contain any lit pixel, so text is rendered without touching the image.
+class GlyphAtlas:
+    def __init__(self, glyphs):
+        self._glyphs = glyphs
+        self._fallback = glyphs['?']
+
+    def glyph(self, c):
+        if len(c) == 1 and c in self._glyphs:
+            return self._glyphs[c]
+
+        return self._fallback
+
+    def rows(self, c):
+        return self.glyph(c)[0]
+
+    def trimmed_rows(self, c):
+        rows, start, end = self.glyph(c)
+        return rows[start:end]
+
+    def __contains__(self, c):
+        return c in self._glyphs
+
+# Expands row masks into a flat list of colours, building each distinct row once
+def render_rows(rows, text_colour, back_colour):
+    lookup = {}
+    pixels = []
+
+    for mask in rows:
+        row = lookup.get(mask)
+        if row is None:
+            row = lookup[mask] = [text_colour if mask >> col & 1 else back_colour for col in range(8)]
+        pixels.extend(row)
+
+    return pixels
+
+def atlas_path(img_file):
+    return os.path.splitext(img_file)[0] + '.atlas.json'
+
+def _compile(img_file, loaded_txt):
+    from PIL import Image
+
+    data = Image.open(img_file).convert('RGB').tobytes()
+
+    glyphs = {}
+
+    for idx, s in enumerate(loaded_txt):
+        offset = idx * GLYPH_PIXELS * 3
+        rows = []
+        lit = []
+
+        for row in range(GLYPH_ROWS):
+            mask = 0
+            any_lit = False
+            for col in range(8):
+                p = offset + (row * 8 + col) * 3
+                pixel = data[p:p + 3]
+                if pixel == b'\xff\xff\xff':
+                    mask |= 1 << col
+                if pixel != b'\x00\x00\x00':
+                    any_lit = True
+            rows.append(mask)
+            lit.append(any_lit)
+
+        # Blank glyphs such as space keep their full width
+        if any(lit):
+            start = lit.index(True)
+            end = GLYPH_ROWS - lit[::-1].index(True)
+        else:
+            start, end = 0, GLYPH_ROWS
+
+        glyphs[s] = [rows, start, end]
+
+    return glyphs
+
+def _read_cached(path, source):
+    import json
+
+    try:
+        with open(path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get('version') != ATLAS_VERSION or cached.get('source') != source:
+        return None
+
+    return cached['glyphs']
+
+def _write_cached(path, source, glyphs):
+    import json
+
+    try:
+        with open(path, 'w') as f:
+            json.dump({'version': ATLAS_VERSION, 'source': source, 'glyphs': glyphs}, f, separators=(',', ':'))
+    except OSError:
+        # Read-only installs just compile the font on every run
+        pass
+
+# Loads the glyph atlas for a font image and its character list. The compiled
+# atlas is cached in memory and on disk next to the image, keyed by a hash of
+# both source files, so the image is only decoded when the font changes.
+def load_atlas(img_file, txt_file):
+    import hashlib
+
+    key = (img_file, txt_file)
+
+    if key in _atlases:
+        return _atlases[key]
+
+    if not os.path.exists(img_file):
+        raise IOError(f"{img_file} is not found")
+
+    with open(img_file, 'rb') as f:
+        img_bytes = f.read()
+
+    with open(txt_file, 'r') as f:
+        loaded_txt = f.read()
+
+    source = hashlib.sha1(img_bytes + loaded_txt.encode('utf-8')).hexdigest()
+    path = atlas_path(img_file)
+
+    glyphs = _read_cached(path, source)
+
+    if glyphs is None:
+        glyphs = _compile(img_file, loaded_txt)
+        _write_cached(path, source, glyphs)
+
+    atlas = GlyphAtlas({s: (tuple(rows), start, end) for s, (rows, start, end) in glyphs.items()})
+    _atlases[key] = atlas
+
+    return atlas
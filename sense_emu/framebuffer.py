@@ -0,0 +1,264 @@
+from operator import itemgetter
+
+# numpy is optional and only imported when a NumpyFramebuffer is created
+np = None
+
+def validate_rgb(color):
+    if len(color) != 3:
+        raise Exception(f"Invalid RGB array {color}")
+
+    for c in color:
+        if (0 <= c <= 255) == False or isinstance(c, int) == False:
+            raise Exception(f"Invalid RGB values {color}")
+
+    return True
+
+# Permutation tables over the 64 cells, built once at import. A transformed
+# frame is a single gather: result[i] = pixels[table[i]].
+def _compose(first, then):
+    return tuple(first[i] for i in then)
+
+IDENTITY_TABLE = tuple(range(64))
+ROTATE_CW_TABLE = tuple((7 - (i % 8)) * 8 + i // 8 for i in range(64))
+ROTATE_CCW_TABLE = tuple((i % 8) * 8 + 7 - i // 8 for i in range(64))
+FLIP_H_TABLE = tuple((i // 8) * 8 + 7 - i % 8 for i in range(64))
+FLIP_V_TABLE = tuple((7 - i // 8) * 8 + i % 8 for i in range(64))
+
+ROTATION_TABLES = {
+    0: IDENTITY_TABLE,
+    90: ROTATE_CW_TABLE,
+    180: _compose(ROTATE_CW_TABLE, ROTATE_CW_TABLE),
+    270: ROTATE_CCW_TABLE,
+}
+
+# Flip followed by the display rotation, so presenting a flipped frame under
+# rotation costs the same single gather as presenting an unflipped one
+FLIP_H_ROTATION_TABLES = {rot: _compose(FLIP_H_TABLE, table) for rot, table in ROTATION_TABLES.items()}
+FLIP_V_ROTATION_TABLES = {rot: _compose(FLIP_V_TABLE, table) for rot, table in ROTATION_TABLES.items()}
+
+def _gatherer(table):
+    return itemgetter(*table)
+
+_ROTATE_CW = _gatherer(ROTATE_CW_TABLE)
+_ROTATE_CCW = _gatherer(ROTATE_CCW_TABLE)
+_FLIP_H = _gatherer(FLIP_H_TABLE)
+_FLIP_V = _gatherer(FLIP_V_TABLE)
+_ROTATIONS = {rot: _gatherer(table) for rot, table in ROTATION_TABLES.items()}
+_FLIP_H_ROTATIONS = {rot: _gatherer(table) for rot, table in FLIP_H_ROTATION_TABLES.items()}
+_FLIP_V_ROTATIONS = {rot: _gatherer(table) for rot, table in FLIP_V_ROTATION_TABLES.items()}
+
+def rotate_cw(matrix):
+    return list(_ROTATE_CW(matrix))
+
+def rotate_ccw(matrix):
+    return list(_ROTATE_CCW(matrix))
+
+def rotate_frame(pixels, rotation):
+    return _ROTATIONS[rotation](pixels)
+
+class ListFramebuffer:
+    name = 'list'
+
+    def __init__(self):
+        self._pixels = [(0, 0, 0)] * 64
+
+        # (indices, palette) of the last indexed frame. Its pixels are only
+        # expanded into _pixels when something reads them.
+        self._indexed = None
+        self._indexed_rotation = None
+
+    def _expanded(self):
+        if self._pixels is None:
+            indices, palette = self._indexed
+            self._pixels = palette.lookup(indices)
+
+        return self._pixels
+
+    def get_pixel(self, u):
+        return self._expanded()[u]
+
+    def get_pixels(self):
+        return self._expanded()
+
+    def set_pixel(self, u, color):
+        self._expanded()[u] = color
+        self._indexed = None
+
+    def set_pixels(self, pixel_ara):
+        if len(pixel_ara) != 64:
+            raise Exception("Pixel List must be of length 64.")
+
+        for pixel in pixel_ara:
+            validate_rgb(pixel)
+
+        # set_pixel writes in place, so frames like the shared tuples from
+        # load_frames are copied rather than stored
+        self._pixels = pixel_ara if isinstance(pixel_ara, list) else list(pixel_ara)
+        self._indexed = None
+
+    # Stores an already validated frame without checking it again
+    def store(self, frame):
+        self._pixels = list(frame)
+        self._indexed = None
+
+    # Keeps a reference to indices, which must not change afterwards. Returns
+    # False, without touching anything, if the frame is the one already
+    # stored and was last presented under the same rotation, so callers can
+    # skip presenting it.
+    def store_indexed(self, indices, palette, rotation):
+        indexed = self._indexed
+        if indexed is not None and indexed[1] is palette and indexed[0] == indices and self._indexed_rotation == rotation:
+            return False
+
+        palette.check(indices)
+
+        self._indexed = (indices, palette)
+        self._indexed_rotation = None
+        self._pixels = None
+
+        return True
+
+    def fill(self, color):
+        self._pixels = [color] * 64
+        self._indexed = None
+
+    def flip_h(self):
+        return list(_FLIP_H(self._expanded()))
+
+    def flip_v(self):
+        return list(_FLIP_V(self._expanded()))
+
+    # Stores the flipped frame and returns it as presented under rotation,
+    # both gathered straight from the current pixels.
+    def apply_flip_h(self, rotation):
+        pixels = self._expanded()
+        self._pixels = list(_FLIP_H(pixels))
+        self._indexed = None
+        return _FLIP_H_ROTATIONS[rotation](pixels)
+
+    def apply_flip_v(self, rotation):
+        pixels = self._expanded()
+        self._pixels = list(_FLIP_V(pixels))
+        self._indexed = None
+        return _FLIP_V_ROTATIONS[rotation](pixels)
+
+    def to_list(self, frame):
+        return frame
+
+    # An indexed frame is rotated as indices and expanded straight into the
+    # presented frame, leaving _pixels unexpanded. The rotation it was
+    # presented under is kept for store_indexed's repeat check.
+    def rotated(self, rotation):
+        if self._indexed is not None:
+            self._indexed_rotation = rotation
+
+        if self._pixels is None:
+            indices, palette = self._indexed
+
+            if rotation != 0:
+                indices = _ROTATIONS[rotation](indices)
+
+            return palette.lookup(indices)
+
+        if rotation == 0:
+            return self._pixels
+
+        return _ROTATIONS[rotation](self._pixels)
+
+# Keeps the display as an 8x8x3 uint8 array so validation, fills, flips and
+# rotation are single vectorized operations instead of per-pixel Python loops.
+class NumpyFramebuffer:
+    name = 'numpy'
+
+    # Number of counter-clockwise quarter turns passed to np.rot90 per rotation
+    ROT90_TURNS = {0: 0, 90: -1, 180: 2, 270: 1}
+
+    def __init__(self):
+        global np
+
+        if np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("The numpy framebuffer requires numpy to be installed")
+
+        self._array = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def get_pixel(self, u):
+        return self._array[u // 8, u % 8].tolist()
+
+    def get_pixels(self):
+        return self.to_list(self._array)
+
+    def set_pixel(self, u, color):
+        self._array[u // 8, u % 8] = color
+
+    def set_pixels(self, pixel_ara):
+        if isinstance(pixel_ara, np.ndarray) and pixel_ara.dtype == np.uint8:
+            array = pixel_ara
+        else:
+            if len(pixel_ara) != 64 and not isinstance(pixel_ara, np.ndarray):
+                raise Exception("Pixel List must be of length 64.")
+
+            try:
+                array = np.asarray(pixel_ara)
+            except ValueError:
+                raise Exception(f"Invalid RGB array {pixel_ara}")
+
+            if array.dtype.kind not in 'iu':
+                raise Exception(f"Invalid RGB values {pixel_ara}")
+
+            if array.size and (array.min() < 0 or array.max() > 255):
+                raise Exception(f"Invalid RGB values {pixel_ara}")
+
+        if array.shape not in ((64, 3), (8, 8, 3)):
+            raise Exception(f"Pixel array must have shape (64, 3) or (8, 8, 3), not {array.shape}")
+
+        self._array = array.reshape(8, 8, 3).astype(np.uint8, copy=False)
+
+    def store(self, frame):
+        self._array = np.array(frame, dtype=np.uint8).reshape(8, 8, 3)
+
+    def store_indexed(self, indices, palette, rotation):
+        palette.check(indices)
+        self.store(palette.lookup(indices))
+
+        return True
+
+    def fill(self, color):
+        self._array = np.empty((8, 8, 3), dtype=np.uint8)
+        self._array[:] = color
+
+    def flip_h(self):
+        return self._array[:, ::-1]
+
+    def flip_v(self):
+        return self._array[::-1]
+
+    def apply_flip_h(self, rotation):
+        self._array = self.flip_h()
+        return self.rotated(rotation)
+
+    def apply_flip_v(self, rotation):
+        self._array = self.flip_v()
+        return self.rotated(rotation)
+
+    def to_list(self, frame):
+        return frame.reshape(64, 3).tolist()
+
+    def rotated(self, rotation):
+        return self.to_list(np.rot90(self._array, self.ROT90_TURNS[rotation]))
+
+FRAMEBUFFERS = {
+    ListFramebuffer.name: ListFramebuffer,
+    NumpyFramebuffer.name: NumpyFramebuffer,
+}
+
+def create_framebuffer(framebuffer=None):
+    if framebuffer is None:
+        framebuffer = ListFramebuffer.name
+
+    if framebuffer not in FRAMEBUFFERS:
+        raise ValueError(f"Unknown framebuffer '{framebuffer}', expected one of {tuple(FRAMEBUFFERS)}")
+
+    return FRAMEBUFFERS[framebuffer]()
@@ -0,0 +1,45 @@
+import os
+
+# Cache key for a decoded image file. A file rewritten in place gets a new
+# mtime or size, so stale frames are never returned.
+def image_key(file_path):
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        raise IOError(f"{file_path} is not found")
+
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+def _pixels(img):
+    return tuple(img.convert('RGB').getdata())
+
+# Decodes the image as a single frame of RGB tuples, whatever its size
+def decode_image(file_path):
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        return _pixels(img)
+
+# Splits every frame of the image (one for a PNG, each frame of an animated
+# GIF) into 8x8 tiles, left to right and top to bottom, so a sprite sheet or
+# an animation decodes into a tuple of 64 pixel frames in one pass
+def decode_frames(file_path):
+    from PIL import Image
+
+    frames = []
+
+    with Image.open(file_path) as img:
+        width, height = img.size
+
+        if width % 8 != 0 or height % 8 != 0:
+            raise ValueError(f"{file_path} is {width}x{height}, which does not split into 8x8 frames")
+
+        for i in range(getattr(img, 'n_frames', 1)):
+            img.seek(i)
+            rgb = img.convert('RGB')
+
+            for y in range(0, height, 8):
+                for x in range(0, width, 8):
+                    frames.append(_pixels(rgb.crop((x, y, x + 8, y + 8))))
+
+    return tuple(frames)
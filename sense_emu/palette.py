@@ -0,0 +1,73 @@
+from .framebuffer import validate_rgb
+
+# Indices are limited to one byte so a frame can be passed as bytes
+MAX_COLOURS = 256
+
+# An ordered set of colours, each validated once when it is added. Frames
+# given as 64 indices into a palette can then be expanded without checking
+# every pixel again.
+class Palette:
+    def __init__(self, colours=()):
+        self._colours = []
+        self._indices = {}
+
+        for colour in colours:
+            self.add(colour)
+
+    # Returns the index of colour, adding it if it is not in the palette yet
+    def add(self, colour):
+        colour = tuple(colour)
+
+        index = self._indices.get(colour)
+        if index is not None:
+            return index
+
+        validate_rgb(colour)
+
+        if len(self._colours) == MAX_COLOURS:
+            raise ValueError(f"A palette can hold at most {MAX_COLOURS} colours")
+
+        index = len(self._colours)
+        self._colours.append(colour)
+        self._indices[colour] = index
+
+        return index
+
+    def index(self, colour):
+        try:
+            return self._indices[tuple(colour)]
+        except KeyError:
+            raise ValueError(f"{colour} is not in the palette")
+
+    # Checks a frame of indices without expanding it
+    def check(self, indices):
+        if len(indices) != 64:
+            raise Exception("Pixel List must be of length 64.")
+
+        # bytes can't hold negative values, but a list could index from the end
+        if not isinstance(indices, (bytes, bytearray, memoryview)) and min(indices) < 0:
+            raise Exception(f"Palette index out of range: {min(indices)}")
+
+        if max(indices) >= len(self._colours):
+            raise Exception(f"Palette index out of range: {max(indices)}")
+
+    def expand(self, indices):
+        self.check(indices)
+
+        return self.lookup(indices)
+
+    # Expands indices that have already been checked
+    def lookup(self, indices):
+        return list(map(self._colours.__getitem__, indices))
+
+    def __getitem__(self, index):
+        return self._colours[index]
+
+    def __len__(self):
+        return len(self._colours)
+
+    def __iter__(self):
+        return iter(self._colours)
+
+    def __contains__(self, colour):
+        return tuple(colour) in self._indices
@@ -0,0 +1,119 @@
+import struct
+import threading
+import time
+
+from .stick import DIRECTIONS
+
+RECORDING_MAGIC = b'SEIR\x01'
+
+# Seconds since recording started, direction index, action index
+RECORD = struct.Struct('<dBB')
+
+ACTIONS = ('pressed', 'released')
+
+# Appends every stick event to a compact binary file: a short header followed
+# by one 10 byte record per event, timestamped with the monotonic clock.
+class StickRecorder:
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(RECORDING_MAGIC)
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, direction, action):
+        offset = time.monotonic() - self._start
+
+        with self._lock:
+            self._file.write(RECORD.pack(offset, DIRECTIONS.index(direction), ACTIONS.index(action)))
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+def load_recording(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(RECORDING_MAGIC):
+        raise ValueError(f"{path} is not a stick recording")
+
+    events = []
+
+    for offset, direction, action in RECORD.iter_unpack(data[len(RECORDING_MAGIC):]):
+        events.append((offset, DIRECTIONS[direction], ACTIONS[action]))
+
+    return events
+
+# Feeds a recorded or synthetic stream of (offset, direction, action) events
+# into a Stick in place of the display backend. Events are released as their
+# offsets come due, with the clock running speed times faster than real time
+# (so a game ticking speed times faster sees the same input timing). With
+# speed=None they are handed out as fast as they are asked for, one per poll,
+# so every loop iteration of a polling game sees exactly one input. Stick
+# handlers are then called from the poll too, so games steering through
+# handlers replay deterministically as long as they read the stick each tick.
+class ReplaySource:
+    def __init__(self, events, speed=1.0):
+        if speed is not None and speed <= 0:
+            raise ValueError('Replay speed must be positive or None')
+
+        self._events = list(events)
+        self._next = 0
+        self._speed = speed
+        self._start = None
+
+    @classmethod
+    def from_file(cls, path, speed=1.0):
+        return cls(load_recording(path), speed)
+
+    @property
+    def finished(self):
+        return self._next >= len(self._events)
+
+    # Replay time in recording seconds, starting at the first request
+    def _elapsed(self):
+        if self._start is None:
+            self._start = time.monotonic()
+
+        return (time.monotonic() - self._start) * self._speed
+
+    def _take(self):
+        offset, direction, action = self._events[self._next]
+        self._next += 1
+        return (direction, action)
+
+    def poll_events(self):
+        if self.finished:
+            return []
+
+        if self._speed is None:
+            return [self._take()]
+
+        elapsed = self._elapsed()
+        events = []
+
+        while not self.finished and self._events[self._next][0] <= elapsed:
+            events.append(self._take())
+
+        return events
+
+    # Returns None once the stream is exhausted
+    def wait_event(self, timeout=None):
+        if self.finished:
+            if timeout is not None:
+                time.sleep(timeout)
+            return None
+
+        if self._speed is not None:
+            delay = (self._events[self._next][0] - self._elapsed()) / self._speed
+
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                return None
+
+            if delay > 0:
+                time.sleep(delay)
+
+        return self._take()
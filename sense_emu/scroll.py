@@ -0,0 +1,63 @@
+import threading
+
+# Handle for a message scrolling in the background. The scroll runs on its own
+# thread and sleeps on an event between frames, so cancel() takes effect
+# immediately. The handle can be waited on from threads or awaited from asyncio
+# code; both resolve to True if the message finished and False if cancelled.
+# wait() returns None if its timeout runs out first.
+class MessageScroll:
+    def __init__(self, frames, scroll_speed, show_frame, previous=None):
+        self._frames = frames
+        self._scroll_speed = scroll_speed
+        self._show_frame = show_frame
+        self._previous = previous
+
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        finished = False
+
+        try:
+            if self._previous is not None:
+                self._previous.wait()
+                self._previous = None
+
+            for frame in self._frames:
+                if not self._show_frame(frame, self._cancelled):
+                    break
+
+                if self._cancelled.wait(self._scroll_speed):
+                    break
+            else:
+                finished = True
+        finally:
+            self._finished = finished
+            self._done.set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            return None
+
+        return self._finished
+
+    def __await__(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(None, self.wait).__await__()
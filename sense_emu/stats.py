@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+
+# 'mirror' is flip_h/flip_v, 'draw' is painting the cells and 'flip' is
+# pushing them to the screen (pygame.display.update)
+PHASES = ('validate', 'rotate', 'mirror', 'draw', 'flip')
+
+# Timings bucketed by power of two: bucket k holds durations in
+# [2 ** (k - 1), 2 ** k) nanoseconds, so 64 buckets cover anything we can time.
+class TimingHistogram:
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, duration_ns):
+        self.buckets[min(duration_ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    # Upper bound of the bucket holding the given fraction of samples
+    def percentile(self, fraction):
+        if self.count == 0:
+            return 0
+
+        target = fraction * self.count
+        seen = 0
+
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return 1 << k
+
+        return self.max_ns
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns // self.count if self.count else 0,
+            'min_ns': self.min_ns or 0,
+            'max_ns': self.max_ns,
+            'p50_ns': self.percentile(0.5),
+            'p99_ns': self.percentile(0.99),
+            'histogram': {1 << k: n for k, n in enumerate(self.buckets) if n},
+        }
+
+def format_stats(stats):
+    lines = [
+        f"frames presented: {stats['frames_presented']}, "
+        f"pixels changed: {stats['pixels_changed']}"
+    ]
+
+    dropped = ', '.join(f"{name}: {n}" for name, n in stats['dropped'].items())
+    lines.append(f"dropped: {dropped}")
+
+    for phase, timing in stats['timings'].items():
+        if timing['count'] == 0:
+            continue
+
+        lines.append(
+            f"{phase:>8}: n={timing['count']} "
+            f"mean={timing['mean_ns'] / 1000:.1f}us "
+            f"p50<{timing['p50_ns'] / 1000:.1f}us "
+            f"p99<{timing['p99_ns'] / 1000:.1f}us "
+            f"max={timing['max_ns'] / 1000:.1f}us"
+        )
+
+    return '\n'.join(lines)
+
+def _print_stats(stats):
+    print(format_stats(stats), file=sys.stderr)
+
+# Render counters and per-phase timings. dropped is a callable returning the
+# drop counters owned by other components, read at snapshot time so they cost
+# nothing to keep up to date. With a dump_interval a daemon thread passes a
+# snapshot to dump every that many seconds (to stderr by default).
+class RenderStats:
+    def __init__(self, dropped=None, dump_interval=None, dump=None):
+        self._dropped = dropped
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+        self.frames_presented = 0
+        self.pixels_changed = 0
+        self.timings = {phase: TimingHistogram() for phase in PHASES}
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+        if dump_interval is not None:
+            if dump_interval <= 0:
+                raise ValueError('Stats dump interval must be positive')
+
+            self._dump_interval = dump_interval
+            self._dump = _print_stats if dump is None else dump
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def record(self, phase, duration_ns):
+        with self._lock:
+            self.timings[phase].record(duration_ns)
+
+    def record_frame(self, pixels_changed):
+        with self._lock:
+            self.frames_presented += 1
+            self.pixels_changed += pixels_changed
+
+    def snapshot(self):
+        with self._lock:
+            stats = {
+                'elapsed': time.monotonic() - self._started,
+                'frames_presented': self.frames_presented,
+                'pixels_changed': self.pixels_changed,
+                'timings': {phase: t.snapshot() for phase, t in self.timings.items()},
+            }
+
+        stats['dropped'] = self._dropped() if self._dropped is not None else {}
+
+        return stats
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self._dump_interval):
+            self._dump(self.snapshot())
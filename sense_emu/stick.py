@@ -0,0 +1,359 @@
+import _thread
+import threading
+import time
+import traceback
+
+from collections import deque
+
+DIRECTIONS = ('up', 'down', 'left', 'right', 'middle')
+
+# How often the input thread wakes up to notice it has been stopped
+INPUT_POLL_INTERVAL = 0.1
+
+# How long a quit seen on the input thread waits for the main thread to read
+# the stick and raise it, before interrupting the main thread instead
+EXIT_GRACE = 1.0
+
+class StickEvent:
+    __slots__ = ('direction', 'action', 'time')
+
+    def __init__(self, dir, act, timestamp=None):
+        self.direction = dir
+        self.action = act
+        self.time = time.time() if timestamp is None else timestamp
+
+    def __str__(self):
+        return f"(timestamp: {self.time}, direction: {self.direction}, action: {self.action})"
+
+    def __repr__(self):
+         return f"(timestamp: {self.time}, direction: {self.direction}, action: {self.action})"
+
+# Fixed-capacity FIFO for stick events. When full, 'drop_oldest' discards the
+# oldest queued event to make room and 'drop_newest' discards the incoming
+# one; either way the loss is counted in dropped.
+class EventRing:
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+    def __init__(self, capacity=64, overflow='drop_oldest'):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError('Event buffer capacity must be a positive integer')
+
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {self.OVERFLOW_POLICIES}")
+
+        self._buffer = deque(maxlen=capacity)
+        self._drop_newest = overflow == 'drop_newest'
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0
+
+    def append(self, event):
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+
+            if self._drop_newest:
+                return
+
+        self._buffer.append(event)
+
+    def popleft(self):
+        return self._buffer.popleft()
+
+    def drain(self):
+        events = list(self._buffer)
+        self._buffer.clear()
+        return events
+
+    def clear(self):
+        self._buffer.clear()
+
+    def __len__(self):
+        return len(self._buffer)
+
+def _takes_event(handler):
+    import inspect
+
+    try:
+        inspect.signature(handler).bind(None)
+    except TypeError:
+        return False
+    except ValueError:
+        # Builtins without a signature are assumed to take the event
+        return True
+
+    return True
+
+class Stick:
+    def __init__(self, backend, capacity=64, overflow='drop_oldest'):
+        self._backend = backend
+        self._input = backend
+        self._recorder = None
+        self._events = EventRing(capacity, overflow)
+        self._held = set()
+        self._cond = threading.Condition()
+
+        self._handlers = {}
+        self._thread = None
+        self._running = False
+
+        # SystemExit raised on the input thread, re-raised on the main thread
+        self._exit = None
+        self._exit_raised = False
+
+    @property
+    def dropped_events(self):
+        return self._events.dropped
+
+    # Directions currently held down, kept up to date from every press and
+    # release so callers never have to replay the event history
+    @property
+    def held(self):
+        return frozenset(self._held)
+
+    def is_held(self, direction):
+        return direction in self._held
+
+    # Reads events from source (anything with poll_events and wait_event, such
+    # as a ReplaySource) instead of the display backend. None goes back to the
+    # backend. A source is only read when the caller polls, never from the
+    # input thread, so a replay advances in step with the game loop.
+    def set_source(self, source=None):
+        self._input = self._backend if source is None else source
+        self._update_input_thread()
+
+    def start_recording(self, path):
+        from .replay import StickRecorder
+
+        self.stop_recording()
+        self._recorder = StickRecorder(path)
+
+    def stop_recording(self):
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def _track(self, direction, action):
+        if self._recorder is not None:
+            self._recorder.record(direction, action)
+
+        if action == 'released':
+            self._held.discard(direction)
+        else:
+            self._held.add(direction)
+
+        return StickEvent(direction, action)
+
+    def _ingest(self, direction, action):
+        with self._cond:
+            event = self._track(direction, action)
+            self._events.append(event)
+            self._cond.notify_all()
+
+        return event
+
+    # While the input thread runs it is the only reader of the backend and
+    # the ring buffer is the queue handing its events to the main thread.
+    # Otherwise handlers are called here, on the caller's thread.
+    def _poll(self):
+        if self._thread is not None:
+            return
+
+        for direction, action in self._input.poll_events():
+            event = self._ingest(direction, action)
+
+            if self._handlers:
+                self._dispatch(event)
+
+    def _raise_exit(self):
+        if self._exit is not None:
+            with self._cond:
+                self._exit_raised = True
+                self._cond.notify_all()
+
+            raise self._exit
+
+    def get_events(self):
+        self._raise_exit()
+        self._poll()
+
+        with self._cond:
+            return self._events.drain()
+
+    # Returns the next joystick event, blocking until one arrives instead of
+    # polling. Events already queued are returned first unless emptybuffer is
+    # set, in which case they are discarded. Returns None if timeout seconds
+    # pass without input.
+    def wait_for_event(self, emptybuffer=False, timeout=None):
+        self._raise_exit()
+        self._poll()
+
+        with self._cond:
+            if emptybuffer:
+                self._events.clear()
+            elif len(self._events) > 0:
+                return self._events.popleft()
+
+            if self._thread is not None:
+                try:
+                    ready = self._cond.wait_for(lambda: len(self._events) > 0 or self._exit is not None, timeout)
+                except KeyboardInterrupt:
+                    # interrupt_main() from the input thread asking us to quit
+                    if self._exit is not None:
+                        raise self._exit from None
+                    raise
+
+                self._raise_exit()
+
+                if not ready:
+                    return None
+                return self._events.popleft()
+
+        stick_event = self._input.wait_event(timeout)
+
+        if stick_event is None:
+            return None
+
+        with self._cond:
+            event = self._track(*stick_event)
+
+        if self._handlers:
+            self._dispatch(event)
+
+        return event
+
+    # Handlers are called from a dedicated input thread with the StickEvent,
+    # or with no arguments if they take none. The thread runs while at least
+    # one handler is set and the stick reads the backend; with a source set,
+    # handlers are called from get_events and wait_for_event instead. Events
+    # are still queued for get_events.
+    @property
+    def direction_up(self):
+        return self._get_handler('up')
+
+    @direction_up.setter
+    def direction_up(self, handler):
+        self._set_handler('up', handler)
+
+    @property
+    def direction_down(self):
+        return self._get_handler('down')
+
+    @direction_down.setter
+    def direction_down(self, handler):
+        self._set_handler('down', handler)
+
+    @property
+    def direction_left(self):
+        return self._get_handler('left')
+
+    @direction_left.setter
+    def direction_left(self, handler):
+        self._set_handler('left', handler)
+
+    @property
+    def direction_right(self):
+        return self._get_handler('right')
+
+    @direction_right.setter
+    def direction_right(self, handler):
+        self._set_handler('right', handler)
+
+    @property
+    def direction_middle(self):
+        return self._get_handler('middle')
+
+    @direction_middle.setter
+    def direction_middle(self, handler):
+        self._set_handler('middle', handler)
+
+    @property
+    def direction_any(self):
+        return self._get_handler('any')
+
+    @direction_any.setter
+    def direction_any(self, handler):
+        self._set_handler('any', handler)
+
+    def _get_handler(self, direction):
+        handler = self._handlers.get(direction)
+        return None if handler is None else handler[0]
+
+    def _set_handler(self, direction, handler):
+        if handler is None:
+            self._handlers.pop(direction, None)
+        elif not callable(handler):
+            raise ValueError(f"Handler for direction '{direction}' must be callable")
+        else:
+            self._handlers[direction] = (handler, _takes_event(handler))
+
+        self._update_input_thread()
+
+    def _update_input_thread(self):
+        if self._handlers and self._input is self._backend:
+            self._start_input_thread()
+        else:
+            self._stop_input_thread()
+
+    def _start_input_thread(self):
+        if self._thread is not None:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_input_thread, daemon=True)
+        self._thread.start()
+
+    def _stop_input_thread(self):
+        if self._thread is None:
+            return
+
+        self._running = False
+
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+        self._thread = None
+
+    # The backend calls exit() on QUIT or ESC, which here would only end this
+    # thread. The SystemExit is stored for get_events and wait_for_event to
+    # raise. Only if the main thread doesn't read the stick within EXIT_GRACE
+    # is it interrupted, which surfaces as a KeyboardInterrupt. Whatever ends
+    # the thread, polling falls back to the caller.
+    def _run_input_thread(self):
+        try:
+            while self._running:
+                stick_event = self._input.wait_event(INPUT_POLL_INTERVAL)
+
+                if stick_event is None:
+                    continue
+
+                self._dispatch(self._ingest(*stick_event))
+        except SystemExit as exc:
+            with self._cond:
+                self._exit = exc
+                self._cond.notify_all()
+
+                raised = self._cond.wait_for(lambda: self._exit_raised, EXIT_GRACE)
+
+            if not raised:
+                _thread.interrupt_main()
+        finally:
+            if self._thread is threading.current_thread():
+                self._thread = None
+                self._running = False
+
+    def _dispatch(self, event):
+        for key in (event.direction, 'any'):
+            handler = self._handlers.get(key)
+
+            if handler is None:
+                continue
+
+            # A failing handler is reported but must not stop input
+            func, takes_event = handler
+            try:
+                if takes_event:
+                    func(event)
+                else:
+                    func()
+            except Exception:
+                traceback.print_exc()
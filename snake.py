@@ -115,6 +115,7 @@ class Coordinates:
         return unaryCoord
  
 DIR_ARRAY = [Coordinates(0, -1), Coordinates(-1, 0), Coordinates(0, 1), Coordinates(1, 0)]
+STICK_DIRECTIONS = {'up': 0, 'left': 1, 'down': 2, 'right': 3}
 
 class Entity(Coordinates):
     def __init__(self, entityType, color, x=-1, y=-1):
@@ -222,28 +223,28 @@ class Game:
         self.resetBoard()
         self.main()
 
+    # Runs on the stick's input thread, so steering is picked up immediately
+    # while the game loop keeps its own tick
+    def steer(self, event):
+        if event.action == 'pressed' and event.direction in STICK_DIRECTIONS:
+            self.player.moveDirection = STICK_DIRECTIONS[event.direction]
+
     def main(self):
         self.updateScreen()
+        sense.stick.direction_any = self.steer
+        try:
+            self.loop()
+        finally:
+            sense.stick.direction_any = None
+
+    def loop(self):
         while self.hasFinished == False:
-            moveDir = self.player.moveDirection
-            for event in sense.stick.get_events():
-                if event.action == 'pressed':
-                    if event.direction == 'up':
-                        moveDir = 0
-                        break
-                    elif event.direction == 'left':
-                        moveDir = 1
-                        break
-                    elif event.direction == 'down':
-                        moveDir = 2
-                        break
-                    elif event.direction == 'right':
-                        moveDir = 3
-                        break
-            
-            self.player.moveDirection = moveDir
             time.sleep(self.frameTime)
 
+            # Steering arrives through steer, but reading the stick every tick
+            # keeps its queue from overflowing and lets a quit end the game
+            sense.stick.get_events()
+
             if self.player.moveSnake(self.fruit):
                 self.fruit.pickRandomLocation(self.player)
 
@@ -292,4 +293,5 @@ class Game:
 
         sense.set_pixels(self.board)
 
-Game()
\ No newline at end of file
+if __name__ == '__main__':
+    Game()